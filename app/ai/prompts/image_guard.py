@@ -34,7 +34,7 @@ Kullanim:
 
 import logging
 import re
-from typing import List, Set
+from typing import Dict, List, Pattern, Set
 
 logger = logging.getLogger(__name__)
 
@@ -129,6 +129,21 @@ FORBIDDEN_STYLE_TOKENS: List[str] = [
 # Daha hızlı arama için set'e çevir (lowercase)
 _FORBIDDEN_SET: Set[str] = {t.lower() for t in FORBIDDEN_STYLE_TOKENS}
 
+# Token basina derlenmis pattern'ler (kelime siniri ile, her cagrida yeniden derlenmez)
+_TOKEN_PATTERNS: Dict[str, Pattern[str]] = {
+    t: re.compile(r'\b' + re.escape(t) + r'\b', re.IGNORECASE)
+    for t in FORBIDDEN_STYLE_TOKENS
+}
+
+# Tum tokenlar icin tek alternation (uzun tokenlar once: "cinematic lighting" > "cinematic").
+# Onde virgul/noktali virgul varsa onu, yoksa arkadakini token ile birlikte yakalar.
+_FORBIDDEN_RE: Pattern[str] = re.compile(
+    r'(?P<pre>[,;]\s*)?\b(?P<token>'
+    + '|'.join(re.escape(t) for t in sorted(_FORBIDDEN_SET, key=len, reverse=True))
+    + r')\b(?(pre)|(?:\s*[,;])?)',
+    re.IGNORECASE,
+)
+
 
 # =============================================================================
 # SANITIZATION FUNCTIONS
@@ -142,8 +157,10 @@ def _normalize_for_search(text: str) -> str:
 def _token_in_text(token: str, text: str) -> bool:
     """Token'in metinde (kelime sınırlarıyla) geçip geçmediğini kontrol et."""
     # Kelime sınırı ile ara (örn: "art" "artstation"u tetiklemesin)
-    pattern = r'\b' + re.escape(token) + r'\b'
-    return bool(re.search(pattern, text, re.IGNORECASE))
+    pattern = _TOKEN_PATTERNS.get(token)
+    if pattern is None:
+        pattern = re.compile(r'\b' + re.escape(token) + r'\b', re.IGNORECASE)
+    return bool(pattern.search(text))
 
 
 def get_forbidden_tokens_in_prompt(prompt: str) -> List[str]:
@@ -188,35 +205,25 @@ def sanitize_image_prompt(
         return generated_prompt
     
     user_lower = _normalize_for_search(user_original)
-    result = generated_prompt
+    
+    # Kullanicinin orijinal mesajinda gecen tokenlar birakilir
+    # (cogu mesajda hic yoktur; tek regex gecisiyle hizli cikis)
+    requested: Set[str] = set()
+    if _FORBIDDEN_RE.search(user_lower):
+        requested = {t for t in _FORBIDDEN_SET if _TOKEN_PATTERNS[t].search(user_lower)}
+    
     removed_tokens = []
     
-    for token in FORBIDDEN_STYLE_TOKENS:
-        # Token kullanicinin orijinal mesajinda var mi?
-        if _token_in_text(token, user_lower):
+    def _strip(match: "re.Match[str]") -> str:
+        token = match.group("token").lower()
+        if token in requested:
             # Kullanici istedi, birak
-            continue
-        
-        # Token uretilen prompt'ta var mi?
-        if _token_in_text(token, result):
-            # Kaldir
-            # Pattern: token'i ve ondan onceki virgul/and'i temizle
-            patterns = [
-                # ", token" veya "; token"
-                r',\s*\b' + re.escape(token) + r'\b',
-                r';\s*\b' + re.escape(token) + r'\b',
-                # "token," veya "token;"
-                r'\b' + re.escape(token) + r'\b\s*[,;]',
-                # Sadece token (kelime siniri ile)
-                r'\b' + re.escape(token) + r'\b',
-            ]
-            
-            for pattern in patterns:
-                new_result = re.sub(pattern, '', result, flags=re.IGNORECASE)
-                if new_result != result:
-                    result = new_result
-                    removed_tokens.append(token)
-                    break
+            return match.group(0)
+        removed_tokens.append(token)
+        return ""
+    
+    # Tek gecis: token'i ve ondan onceki (yoksa sonraki) virgul/noktali virgulu kaldir
+    result = _FORBIDDEN_RE.sub(_strip, generated_prompt)
     
     # Cift bosluk ve gereksiz virgulleri temizle
     result = re.sub(r'\s+', ' ', result)
@@ -245,8 +252,7 @@ def validate_prompt_minimal(prompt: str) -> bool:
     Returns:
         bool: True = minimal/temiz, False = forbidden token var
     """
-    found = get_forbidden_tokens_in_prompt(prompt)
-    return len(found) == 0
+    return _FORBIDDEN_RE.search(prompt) is None
 
 
 
@@ -132,10 +132,10 @@ def _mem_key(s: str) -> str:
 
 
 def _estimate_tokens(text: str) -> int:
-    """Token tahmini (4 char ≈ 1 token)."""
-    if not text:
-        return 0
-    return max(1, len(text) // 4)
+    """Token tahmini (context_manager ile aynı birim: UTF-8 byte / 4)."""
+    from app.services.context_truncation_manager import ContextTruncationManager
+    
+    return ContextTruncationManager.estimate_tokens(text)
 
 
 def build_memory_hint(memory_blocks: Dict[str, Any]) -> str:
@@ -355,6 +355,17 @@ async def build_enhanced_context(
     return _truncate_context_text(full_context), memories_for_decider
 
 
+def _image_prefix_len(text: str) -> int:
+    """
+    Görsel prompt prefix uzunluğu: '!!' -> 2, '!' -> 1, prefix yok -> 0.
+
+    İlk iki karakter tek karşılaştırmayla ayrılır (art arda startswith yok).
+    """
+    if not text or text[0] != "!":
+        return 0
+    return 2 if text[1:2] == "!" else 1
+
+
 async def build_image_prompt(user_message: str, style_profile: Optional[Dict[str, Any]] = None) -> str:
     """
     Görsel üretimi için prompt oluşturur.
@@ -389,7 +400,9 @@ async def build_image_prompt(user_message: str, style_profile: Optional[Dict[str
     raw_prompt = False
     style_guard = True
     
-    if normalized.startswith("!!"):
+    prefix_len = _image_prefix_len(normalized)
+    
+    if prefix_len == 2:
         # !! prefix: RAW + GUARD KAPALI
         raw_prompt = True
         style_guard = False
@@ -400,7 +413,7 @@ async def build_image_prompt(user_message: str, style_profile: Optional[Dict[str
         )
         return prompt
     
-    elif normalized.startswith("!"):
+    elif prefix_len == 1:
         # ! prefix: RAW + GUARD AÇIK
         raw_prompt = True
         style_guard = True
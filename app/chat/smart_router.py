@@ -147,6 +147,37 @@ NSFW_IMAGE_PATTERNS = [
 ]
 
 
+def _compile_any(patterns: List[str]) -> re.Pattern:
+    """
+    Pattern listesini tek bir alternation regex'ine derler.
+    
+    Baştaki "(?i)" flag'i her alternatife scoped olarak taşınır
+    ("(?i:...)"), böylece flag'siz pattern'ler (ör. "^!{1,2}") etkilenmez.
+    Tek search() çağrısı, listeyi tek tek denemekle aynı sonucu verir.
+    
+    Args:
+        patterns: Regex pattern listesi
+    
+    Returns:
+        re.Pattern: Derlenmiş birleşik pattern
+    """
+    parts = []
+    for pattern in patterns:
+        if pattern.startswith("(?i)"):
+            parts.append("(?i:" + pattern[4:] + ")")
+        else:
+            parts.append("(?:" + pattern + ")")
+    return re.compile("|".join(parts))
+
+
+# Module import'ta bir kez derlenir (her SmartRouter instance'ı paylaşır)
+_IMAGE_RE = _compile_any(IMAGE_PATTERNS)
+_INTERNET_RE = _compile_any(INTERNET_PATTERNS)
+_LOCAL_EXPLICIT_RE = _compile_any(LOCAL_EXPLICIT_PATTERNS)
+_LOCAL_CONTENT_RE = _compile_any(LOCAL_CONTENT_PATTERNS)
+_NSFW_IMAGE_RE = _compile_any(NSFW_IMAGE_PATTERNS)
+
+
 # =============================================================================
 # SMART ROUTER
 # =============================================================================
@@ -160,12 +191,12 @@ class SmartRouter:
     
     def __init__(self):
         """Router'ı başlatır."""
-        # Compiled regex patterns for performance
-        self._image_patterns = [re.compile(p) for p in IMAGE_PATTERNS]
-        self._internet_patterns = [re.compile(p) for p in INTERNET_PATTERNS]
-        self._local_explicit = [re.compile(p) for p in LOCAL_EXPLICIT_PATTERNS]
-        self._local_content = [re.compile(p) for p in LOCAL_CONTENT_PATTERNS]
-        self._nsfw_image = [re.compile(p) for p in NSFW_IMAGE_PATTERNS]
+        # Compiled regex patterns for performance (grup başına tek regex)
+        self._image_patterns = _IMAGE_RE
+        self._internet_patterns = _INTERNET_RE
+        self._local_explicit = _LOCAL_EXPLICIT_RE
+        self._local_content = _LOCAL_CONTENT_RE
+        self._nsfw_image = _NSFW_IMAGE_RE
     
     # -------------------------------------------------------------------------
     # LAZY IMPORTS
@@ -204,12 +235,9 @@ class SmartRouter:
     # PATTERN MATCHING
     # -------------------------------------------------------------------------
     
-    def _matches_any(self, text: str, patterns: List[re.Pattern]) -> bool:
-        """Herhangi bir pattern eşleşiyor mu?"""
-        for pattern in patterns:
-            if pattern.search(text):
-                return True
-        return False
+    def _matches_any(self, text: str, pattern: re.Pattern) -> bool:
+        """Birleşik pattern'deki herhangi bir alternatif eşleşiyor mu?"""
+        return pattern.search(text) is not None
     
     def _detect_tool_intent(self, message: str) -> ToolIntent:
         """
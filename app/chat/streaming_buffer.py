@@ -5,19 +5,55 @@ Mami AI - Streaming Buffer Manager
 Memory-efficient circular buffer for streaming responses.
 
 Özellikler:
-    - Fixed-size deque (auto-pop oldest chunks)
+    - Preallocated ring buffer (oldest chunk is overwritten when full)
     - O(1) append complexity
     - Automatic garbage collection
     - Memory-safe finalization
 """
 
 import logging
-from collections import deque
-from typing import Optional
+import threading
+from itertools import chain, islice
+from typing import Iterable, Iterator, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
 
+class _RingView:
+    """
+    Read-only FIFO view over a StreamingBuffer's ring (no list copy).
+    
+    Supports len(), iteration (list()/"".join()) and indexing.
+    """
+    
+    __slots__ = ("_buffer",)
+    
+    def __init__(self, buffer: "StreamingBuffer"):
+        self._buffer = buffer
+    
+    def __len__(self) -> int:
+        return self._buffer._count
+    
+    def __iter__(self) -> Iterator[str]:
+        b = self._buffer
+        if b._count < b.max_chunks:
+            return islice(b._ring, b._count)
+        return chain(islice(b._ring, b._head, None), islice(b._ring, b._head))
+    
+    def __getitem__(self, index: int) -> str:
+        b = self._buffer
+        if index < 0:
+            index += b._count
+        if not 0 <= index < b._count:
+            raise IndexError("StreamingBuffer chunk index out of range")
+        if b._count < b.max_chunks:
+            return b._ring[index]
+        return b._ring[(b._head + index) % b.max_chunks]
+    
+    def __repr__(self) -> str:
+        return f"_RingView({list(self)!r})"
+
+
 class StreamingBuffer:
     """
     Fixed-size circular buffer for streaming responses.
@@ -39,7 +75,28 @@ class StreamingBuffer:
         # Buffer is automatically cleared after finalize
     """
     
-    def __init__(self, max_chunks: int = 500):
+    # Her stream icin bir instance; append sicak yolunda dict yerine slot erisimi
+    __slots__ = (
+        "max_chunks",
+        "binary",
+        "_ring",
+        "_head",
+        "_count",
+        "_total_chars",
+        "_finalized",
+        "_total_chunks_received",
+        "_received_base",
+        "_drop_base",
+    )
+    
+    # Binary finalize icin paylasilan bytearray havuzu (instance'lar arasi, sinirli).
+    # Surec geneli paylasildigi icin (worker thread'ler dahil) _POOL_LOCK ile korunur.
+    _POOL: List[bytearray] = []
+    _POOL_LOCK = threading.Lock()
+    _POOL_MAX = 8
+    _POOL_MAX_BYTES = 1 << 20  # Daha buyuk buffer'lar havuzda tutulmaz
+    
+    def __init__(self, max_chunks: int = 500, binary: bool = False):
         """
         Initialize streaming buffer.
         
@@ -47,34 +104,197 @@ class StreamingBuffer:
             max_chunks: Maximum number of chunks to keep in memory.
                        When exceeded, oldest chunks are automatically removed.
                        Default: 500 chunks (~50KB for typical responses)
+            binary: True ise chunk'lar UTF-8 bytes olarak saklanir ve
+                    finalize'da tek seferde decode edilir (chunk basina
+                    decode yok). total_chars bu modda byte sayisidir.
         """
         self.max_chunks = max_chunks
-        self.chunks = deque(maxlen=max_chunks)  # Auto-pop oldest when full
+        self.binary = binary
+        # Ring buffer: dolana kadar _head=0 ve chunk'lar [0:_count] araliginda;
+        # doluyken en eski chunk _head'de (yeni chunk onun uzerine yazilir)
+        self._ring: List[Optional[Union[str, bytes]]] = [None] * max_chunks
+        self._head = 0
+        self._count = 0
+        self._total_chars = 0  # Ring'deki chunk'larin toplam uzunlugu (append/evict ile guncellenir)
         self._finalized: Optional[str] = None
         self._total_chunks_received = 0
-        self._chunks_dropped = 0
+        # Dusen chunk sayisi append'te sayilmaz, _dropped() ile hesaplanir:
+        # _received_base = son ring reset'indeki received, _drop_base = o ana kadar dusenler
+        self._received_base = 0
+        self._drop_base = 0
         
         logger.debug(f"[STREAMING_BUFFER] Initialized with max_chunks={max_chunks}")
     
-    def append(self, chunk: str):
+    def append(self, chunk: Union[str, bytes]):
         """
         Append a chunk to the buffer.
         
         If buffer is full, oldest chunk is automatically removed.
         
         Args:
-            chunk: Text chunk to append
+            chunk: Text chunk to append (UTF-8 bytes when binary=True)
+        
+        Raises:
+            TypeError: binary=True iken chunk bytes degilse
         """
+        if self.binary and not isinstance(chunk, (bytes, bytearray)):
+            raise TypeError(f"binary StreamingBuffer expects bytes, got {type(chunk).__name__}")
         if not chunk:
             return
         
+        if self._finalized is not None:
+            self._reopen()
+        
         self._total_chunks_received += 1
         
-        # Check if we'll drop a chunk
-        if len(self.chunks) == self.max_chunks:
-            self._chunks_dropped += 1
+        count = self._count
+        max_chunks = self.max_chunks
+        if count < max_chunks:
+            self._ring[count] = chunk
+            self._count = count + 1
+            self._total_chars += len(chunk)
+            return
+        
+        # Buffer full: overwrite oldest chunk
+        if max_chunks:
+            ring = self._ring
+            head = self._head
+            self._total_chars += len(chunk) - len(ring[head])
+            ring[head] = chunk
+            self._head = (head + 1) % max_chunks
+    
+    def extend(self, chunks: Iterable[Union[str, bytes]]):
+        """
+        Append several chunks at once (same result as calling append() for each).
+        
+        Counters are updated once and chunks are written into the ring with
+        slice assignment instead of one Python-level append per chunk.
+        
+        Args:
+            chunks: Text chunks to append (empty chunks are ignored)
+        
+        Raises:
+            TypeError: binary=True iken chunk'lardan biri bytes degilse
+        """
+        chunks = list(chunks)
+        if self.binary:
+            for c in chunks:
+                if not isinstance(c, (bytes, bytearray)):
+                    raise TypeError(f"binary StreamingBuffer expects bytes, got {type(c).__name__}")
+        new = [c for c in chunks if c]
+        if not new:
+            return
+        
+        if self._finalized is not None:
+            self._reopen()
         
-        self.chunks.append(chunk)
+        incoming = len(new)
+        self._total_chunks_received += incoming
+        
+        max_chunks = self.max_chunks
+        if not max_chunks:
+            return
+        
+        count = self._count
+        if count + incoming <= max_chunks:
+            # Fits without eviction (ring not full, so _head == 0)
+            self._ring[count:count + incoming] = new
+            self._count = count + incoming
+            self._total_chars += sum(map(len, new))
+            return
+        
+        # Overflow: keep the newest max_chunks chunks, laid out from slot 0
+        keep = (self._ordered() + new)[-max_chunks:]
+        self._ring[:] = keep
+        self._head = 0
+        self._count = max_chunks
+        self._total_chars = sum(map(len, keep))
+    
+    def _reopen(self):
+        """Append after finalize: cached text becomes the first chunk again and the cache is invalidated."""
+        if self.max_chunks and self._finalized:
+            seed = self._finalized.encode("utf-8") if self.binary else self._finalized
+            self._ring[0] = seed
+            self._count = 1
+            self._total_chars = len(seed)
+            self._received_base -= 1  # Seed chunk de bir slot kaplar
+        self._finalized = None
+    
+    @property
+    def chunks(self) -> _RingView:
+        """
+        Current chunks in FIFO order (oldest first), as a lazy view.
+        
+        View her erisimde yeniden olusturulur; instance'ta tutulmaz ki
+        buffer <-> view referans dongusu olusmasin ve buffer refcount ile
+        hemen serbest kalsin.
+        """
+        return _RingView(self)
+    
+    def _ordered(self) -> List[Union[str, bytes]]:
+        """Chunks in FIFO order as a list (at most two slices of references)."""
+        if self._count < self.max_chunks:
+            return self._ring[:self._count]
+        return self._ring[self._head:] + self._ring[:self._head]
+    
+    @classmethod
+    def _acquire(cls, size: int) -> bytearray:
+        """Pop a pooled bytearray of at least ``size`` bytes (or allocate one)."""
+        with cls._POOL_LOCK:
+            for i, buf in enumerate(cls._POOL):
+                if len(buf) >= size:
+                    return cls._POOL.pop(i)
+        return bytearray(size)
+    
+    @classmethod
+    def _release(cls, buf: bytearray):
+        """Return a bytearray to the pool (bounded count and size)."""
+        if len(buf) > cls._POOL_MAX_BYTES:
+            return
+        with cls._POOL_LOCK:
+            if len(cls._POOL) < cls._POOL_MAX:
+                cls._POOL.append(buf)
+    
+    def _decode_pooled(self, ordered: List[bytes]) -> str:
+        """
+        Copy byte chunks into a pooled buffer and decode once.
+        
+        Decode her zaman strict yapilir (producer'in gecersiz UTF-8'i gizlenmez).
+        Bu ring'de overflow ile chunk dusmusse en eski chunk'in basindaki
+        yarim karakterin continuation byte'lari (0x80-0xBF, en fazla 3) atlanir.
+        
+        Raises:
+            UnicodeDecodeError: Gecersiz UTF-8
+        """
+        size = self._total_chars
+        in_ring = self._total_chunks_received - self._received_base
+        buf = self._acquire(size)
+        try:
+            with memoryview(buf) as mv:
+                offset = 0
+                for chunk in ordered:
+                    end = offset + len(chunk)
+                    mv[offset:end] = chunk
+                    offset = end
+                start = 0
+                if in_ring > self.max_chunks:
+                    while start < min(3, size) and 0x80 <= buf[start] <= 0xBF:
+                        start += 1
+                return str(mv[start:size], "utf-8")
+        finally:
+            self._release(buf)
+    
+    def _dropped(self) -> int:
+        """Number of chunks evicted by overflow (derived, not counted per append)."""
+        in_ring = self._total_chunks_received - self._received_base
+        return self._drop_base + max(0, in_ring - self.max_chunks)
+    
+    def _reset_ring(self):
+        """Null out stored chunk references so they can be garbage collected."""
+        self._ring[:self._count] = [None] * self._count
+        self._head = 0
+        self._count = 0
+        self._total_chars = 0
     
     def finalize(self) -> str:
         """
@@ -82,30 +302,41 @@ class StreamingBuffer:
         
         After finalization:
         - Buffer is cleared to free memory
-        - Result is cached for multiple calls
-        - No more chunks can be appended
+        - Result is cached; repeated calls return it in O(1)
+        - A later append() invalidates the cache (finalized text is kept as
+          the first chunk)
         
         Returns:
             str: Complete text from all chunks
         """
-        if self._finalized is None:
-            # Join all chunks
-            self._finalized = "".join(self.chunks)
-            
-            # Log statistics
-            if self._chunks_dropped > 0:
-                logger.warning(
-                    f"[STREAMING_BUFFER] Dropped {self._chunks_dropped} chunks "
-                    f"(buffer overflow, max={self.max_chunks})"
-                )
-            
-            logger.debug(
-                f"[STREAMING_BUFFER] Finalized: {self._total_chunks_received} chunks, "
-                f"{len(self._finalized)} chars, {self._chunks_dropped} dropped"
+        if self._finalized is not None:
+            return self._finalized
+        
+        # Single join over the ring (total length computed once, one allocation).
+        # Full ring that has not wrapped (or wrapped back to 0) is joined in place.
+        ordered = self._ring if self._count == self.max_chunks and self._head == 0 else self._ordered()
+        if self.binary:
+            self._finalized = self._decode_pooled(ordered)
+        else:
+            self._finalized = "".join(ordered)
+        
+        # Log statistics
+        dropped = self._dropped()
+        if dropped > 0:
+            logger.warning(
+                f"[STREAMING_BUFFER] Dropped {dropped} chunks "
+                f"(buffer overflow, max={self.max_chunks})"
             )
-            
-            # Clear buffer for garbage collection
-            self.chunks.clear()
+        
+        logger.debug(
+            f"[STREAMING_BUFFER] Finalized: {self._total_chunks_received} chunks, "
+            f"{len(self._finalized)} chars, {dropped} dropped"
+        )
+        
+        # Clear buffer for garbage collection
+        self._drop_base = dropped
+        self._received_base = self._total_chunks_received
+        self._reset_ring()
         
         return self._finalized
     
@@ -115,10 +346,11 @@ class StreamingBuffer:
         
         Useful for error recovery or manual cleanup.
         """
-        self.chunks.clear()
+        self._reset_ring()
         self._finalized = None
         self._total_chunks_received = 0
-        self._chunks_dropped = 0
+        self._received_base = 0
+        self._drop_base = 0
         
         logger.debug("[STREAMING_BUFFER] Cleared")
     
@@ -131,16 +363,17 @@ class StreamingBuffer:
         """
         return {
             "max_chunks": self.max_chunks,
-            "current_chunks": len(self.chunks),
+            "current_chunks": self._count,
+            "total_chars": self._total_chars,
             "total_received": self._total_chunks_received,
-            "dropped": self._chunks_dropped,
+            "dropped": self._dropped(),
             "finalized": self._finalized is not None,
-            "memory_usage_estimate_kb": len(self.chunks) * 100 / 1024  # Rough estimate
+            "memory_usage_estimate_kb": self._count * 100 / 1024  # Rough estimate
         }
     
     def __len__(self) -> int:
         """Return current number of chunks in buffer."""
-        return len(self.chunks)
+        return self._count
     
     def __del__(self):
         """Cleanup on garbage collection."""
@@ -52,6 +52,9 @@ class ForgeCircuitBreaker:
             timeout_seconds: OPEN durumunda ne kadar beklenir
             half_open_timeout: HALF_OPEN durumunda ne kadar test edilir
         """
+        # Saat kaynağı - testlerde monkeypatch edilebilir (sleep yerine)
+        self._now = datetime.now
+
         self.failure_threshold = failure_threshold
         self.timeout = timedelta(seconds=timeout_seconds)
         self.half_open_timeout = timedelta(seconds=half_open_timeout)
@@ -61,7 +64,7 @@ class ForgeCircuitBreaker:
         self.success_count = 0
         self.last_failure_time: Optional[datetime] = None
         self.last_success_time: Optional[datetime] = None
-        self.last_state_change: datetime = datetime.now()
+        self.last_state_change: datetime = self._now()
     
     def can_attempt(self) -> bool:
         """
@@ -70,7 +73,7 @@ class ForgeCircuitBreaker:
         Returns:
             bool: True ise istek yapılabilir
         """
-        now = datetime.now()
+        now = self._now()
         
         if self.state == CircuitState.CLOSED:
             # Normal durum - tüm istekler geçebilir
@@ -103,13 +106,13 @@ class ForgeCircuitBreaker:
         """Başarılı istek kaydı"""
         self.failure_count = 0
         self.success_count += 1
-        self.last_success_time = datetime.now()
+        self.last_success_time = self._now()
         
         if self.state == CircuitState.HALF_OPEN:
             # Test başarılı - CLOSED'a dön
             logger.info("[CIRCUIT] HALF_OPEN → CLOSED (test başarılı)")
             self.state = CircuitState.CLOSED
-            self.last_state_change = datetime.now()
+            self.last_state_change = self._now()
         
         if self.state == CircuitState.CLOSED:
             logger.debug(f"[CIRCUIT] CLOSED - başarı kaydedildi (toplam başarı: {self.success_count})")
@@ -117,7 +120,7 @@ class ForgeCircuitBreaker:
     def record_failure(self, error: Optional[Exception] = None):
         """Başarısız istek kaydı"""
         self.failure_count += 1
-        self.last_failure_time = datetime.now()
+        self.last_failure_time = self._now()
         
         error_msg = f": {error}" if error else ""
         logger.warning(f"[CIRCUIT] Hata kaydedildi ({self.failure_count}/{self.failure_threshold}){error_msg}")
@@ -126,14 +129,14 @@ class ForgeCircuitBreaker:
             # Test başarısız - tekrar OPEN'a dön
             logger.error("[CIRCUIT] HALF_OPEN → OPEN (test başarısız)")
             self.state = CircuitState.OPEN
-            self.last_state_change = datetime.now()
+            self.last_state_change = self._now()
             return
         
         if self.failure_count >= self.failure_threshold:
             # Threshold aşıldı - OPEN durumuna geç
             logger.error(f"[CIRCUIT] CLOSED → OPEN (threshold aşıldı: {self.failure_count} hata)")
             self.state = CircuitState.OPEN
-            self.last_state_change = datetime.now()
+            self.last_state_change = self._now()
     
     def get_state(self) -> dict:
         """
@@ -142,7 +145,7 @@ class ForgeCircuitBreaker:
         Returns:
             dict: Durum bilgileri
         """
-        now = datetime.now()
+        now = self._now()
         return {
             "state": self.state.value,
             "failure_count": self.failure_count,
@@ -160,7 +163,7 @@ class ForgeCircuitBreaker:
         self.state = CircuitState.CLOSED
         self.failure_count = 0
         self.success_count = 0
-        self.last_state_change = datetime.now()
+        self.last_state_change = self._now()
 
 
 # Global circuit breaker instance
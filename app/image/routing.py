@@ -30,7 +30,8 @@ import logging
 import re
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
 
 if TYPE_CHECKING:
     from app.core.models import User
@@ -70,15 +71,48 @@ def _get_checkpoints() -> Dict[FluxVariant, str]:
 CHECKPOINTS = _get_checkpoints()
 
 
+# =============================================================================
+# DEFAULT PARAMETERS
+# =============================================================================
+
+# Varsayilan generation parametreleri (salt okunur, her istekte kopyalanir)
+_DEFAULT_PARAMS: Mapping[str, Any] = MappingProxyType({
+    "steps": 20,
+    "width": 1024,   # Varsayilan cozunurluk: Kare (1024x1024)
+    "height": 1024,
+    "cfg_scale": 1.0,
+    "sampler_name": "Euler",
+    "scheduler": "Simple",
+    "distilled_cfg_scale": 3.5,
+})
+
+# style_profile.image_ratio -> (width, height)
+_RATIO_SIZES: Mapping[str, Tuple[int, int]] = MappingProxyType({
+    "portrait": (896, 1152),
+    "landscape": (1216, 832),
+    "cinematic": (1344, 768),
+})
+
+# Karar nedeni sabitleri
+REASON_NO_IMAGE_PERMISSION = "no_image_permission"
+REASON_NSFW_DETECTED = "nsfw_content_detected"
+REASON_NSFW_BLOCKED = "nsfw_blocked_no_permission"
+REASON_NSFW_ALLOWED = "nsfw_allowed_using_uncensored"
+REASON_SAFE_CONTENT = "safe_content_using_standard"
+REASON_TEMP_OVERRIDE = "TEMP_OVERRIDE_using_nsfw_model_for_all"
+
+
 # =============================================================================
 # IMAGE JOB SPEC
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class ImageJobSpec:
     """
     Gorsel uretim job'i icin routing karari.
     
+    slots=True: instance basina __dict__ olusturulmaz (daha az bellek/GC yuku).
+    
     Attributes:
         variant: flux_standard veya flux_uncensored
         checkpoint_name: Forge'a gonderilecek .safetensors dosya adi
@@ -256,7 +290,7 @@ def decide_image_job(
     
     # 1. Gorsel uretim izni kontrol
     if not _can_use_image(user):
-        reasons.append("no_image_permission")
+        reasons.append(REASON_NO_IMAGE_PERMISSION)
         return ImageJobSpec(
             variant=FluxVariant.STANDARD,
             checkpoint_name=CHECKPOINTS[FluxVariant.STANDARD],
@@ -274,7 +308,7 @@ def decide_image_job(
     flags["nsfw_detected"] = nsfw_detected
     
     if nsfw_detected:
-        reasons.append("nsfw_content_detected")
+        reasons.append(REASON_NSFW_DETECTED)
     
     # 3. Censorship level
     censorship_level = _get_censorship_level(user)
@@ -286,7 +320,7 @@ def decide_image_job(
         
         if not can_nsfw:
             # NSFW reddedildi
-            reasons.append("nsfw_blocked_no_permission")
+            reasons.append(REASON_NSFW_BLOCKED)
             return ImageJobSpec(
                 variant=FluxVariant.STANDARD,
                 checkpoint_name=CHECKPOINTS[FluxVariant.STANDARD],
@@ -300,11 +334,11 @@ def decide_image_job(
             )
         
         # NSFW izin var -> uncensored model
-        reasons.append("nsfw_allowed_using_uncensored")
+        reasons.append(REASON_NSFW_ALLOWED)
         variant = FluxVariant.UNCENSORED
     else:
         # Normal icerik -> standard model
-        reasons.append("safe_content_using_standard")
+        reasons.append(REASON_SAFE_CONTENT)
         variant = FluxVariant.STANDARD
     
     # ============================================================================
@@ -312,42 +346,23 @@ def decide_image_job(
     # TODO: Bu satırları sil veya comment out et (eski haline dönmek için)
     # ============================================================================
     variant = FluxVariant.UNCENSORED
-    reasons.append("TEMP_OVERRIDE_using_nsfw_model_for_all")
+    reasons.append(REASON_TEMP_OVERRIDE)
     # ============================================================================
     
     # 5. Checkpoint secimi
     checkpoint_name = CHECKPOINTS[variant]
     
-    # 6. Parametreleri hazirla
-    final_params = params or {}
-    
-    # Varsayılan çözünürlük: Kare (1024x1024)
-    default_w, default_h = 1024, 1024
+    # 6. Parametreleri hazirla (varsayilanlar + kullanici tercihi + acik parametreler)
+    final_params = dict(_DEFAULT_PARAMS)
     
     # Kullanıcı tercihi varsa uygula
     if style_profile:
-        ratio = style_profile.get("image_ratio", "square")
-        if ratio == "portrait":
-            default_w, default_h = 896, 1152
-        elif ratio == "landscape":
-            default_w, default_h = 1216, 832
-        elif ratio == "cinematic":
-            default_w, default_h = 1344, 768
-            
-    if "steps" not in final_params:
-        final_params["steps"] = 20
-    if "width" not in final_params:
-        final_params["width"] = default_w
-    if "height" not in final_params:
-        final_params["height"] = default_h
-    if "cfg_scale" not in final_params:
-        final_params["cfg_scale"] = 1.0
-    if "sampler_name" not in final_params:
-        final_params["sampler_name"] = "Euler"
-    if "scheduler" not in final_params:
-        final_params["scheduler"] = "Simple"
-    if "distilled_cfg_scale" not in final_params:
-        final_params["distilled_cfg_scale"] = 3.5
+        size = _RATIO_SIZES.get(style_profile.get("image_ratio", "square"))
+        if size:
+            final_params["width"], final_params["height"] = size
+    
+    if params:
+        final_params.update(params)
     
     # 7. Spec olustur
     spec = ImageJobSpec(
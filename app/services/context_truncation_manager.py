@@ -13,8 +13,56 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# Kritik kelimeler (önemli bilgi içeriyor olabilir)
+_CRITICAL_KEYWORDS: Tuple[str, ...] = (
+    "önemli", "kritik", "unutma", "hatırla", "dikkat", "warning", "error",
+)
+
+# Önem skoru ağırlıkları (calculate_message_importance ve
+# calculate_importance_batch aynı sabitleri kullanır)
+_POSITION_MIN = 0.3        # En eski mesaj; en yeni = _POSITION_MIN + _POSITION_RANGE
+_POSITION_RANGE = 0.7
+_ROLE_WEIGHT_USER = 1.0
+_ROLE_WEIGHT_OTHER = 0.8
+_SHORT_LENGTH = 20         # < 20 char: kısa
+_MEDIUM_LENGTH = 50        # < 50 char: orta
+_LENGTH_WEIGHT_SHORT = 0.5
+_LENGTH_WEIGHT_MEDIUM = 0.7
+_LENGTH_WEIGHT_LONG = 1.0
+_QUESTION_WEIGHT = 1.1
+_CODE_WEIGHT = 1.2
+_CRITICAL_WEIGHT = 1.15
+# Faktörlerin final skordaki payları
+_POSITION_SHARE = 0.4
+_ROLE_SHARE = 0.2
+_LENGTH_SHARE = 0.2
+_CONTENT_SHARE = 0.2
+
+
+def _combine_importance(position_weight, role_weight, length_weight, content_weight):
+    """Faktör ağırlıklarını final skora çevirir (float veya np.ndarray)."""
+    return (
+        position_weight * _POSITION_SHARE +
+        role_weight * _ROLE_SHARE +
+        length_weight * _LENGTH_SHARE +
+        content_weight * _CONTENT_SHARE
+    )
+
+
+def _has_code(content: str) -> bool:
+    """Kod bloğu / kod parçası var mı?"""
+    return "```" in content or "def " in content or "class " in content
+
+
+def _has_critical(content: str) -> bool:
+    """Kritik kelime var mı?"""
+    lowered = content.lower()
+    return any(kw in lowered for kw in _CRITICAL_KEYWORDS)
+
 
 class ContextTruncationManager:
     """
@@ -37,7 +85,11 @@ class ContextTruncationManager:
     @staticmethod
     def estimate_tokens(text: str) -> int:
         """
-        Token tahmini (4 char ≈ 1 token).
+        Token tahmini (UTF-8 byte'ı üzerinden, 4 byte ≈ 1 token).
+        
+        Modellerin tokenizer'ları byte-level BPE'dir; ASCII metinde sonuç
+        eski len/4 ile aynıdır, Türkçe karakterler (ç, ğ, ı, ö, ş, ü) ve
+        emoji gibi çok byte'lı karakterler ise daha fazla token sayılır.
         
         Args:
             text: Tahmin edilecek metin
@@ -47,7 +99,33 @@ class ContextTruncationManager:
         """
         if not text:
             return 0
-        return max(1, len(text) // 4)
+        return max(1, len(text.encode("utf-8")) // 4)
+    
+    @classmethod
+    def count_tokens(cls, text: str) -> int:
+        """
+        Token sayısı (budget hesaplarında kullanılan tek birim: estimate_tokens).
+        
+        Args:
+            text: Sayılacak metin
+            
+        Returns:
+            int: Token sayısı
+        """
+        return cls.estimate_tokens(text)
+    
+    @classmethod
+    def count_tokens_batch(cls, texts: List[str]) -> List[int]:
+        """
+        Birden fazla metnin token sayısı (count_tokens ile aynı birim).
+        
+        Args:
+            texts: Sayılacak metinler
+            
+        Returns:
+            List[int]: Her metin için token sayısı (aynı sırada)
+        """
+        return [cls.count_tokens(text) for text in texts]
     
     @staticmethod
     def calculate_message_importance(
@@ -77,46 +155,83 @@ class ContextTruncationManager:
         
         # 1. Position importance (yeni mesajlar daha önemli)
         # Son %20: 1.0, İlk %20: 0.3
-        position_weight = 0.3 + (0.7 * position_index / max(1, total_messages - 1))
+        position_weight = _POSITION_MIN + (_POSITION_RANGE * position_index / max(1, total_messages - 1))
         
         # 2. Role importance
-        role_weight = 1.0 if role == "user" else 0.8
+        role_weight = _ROLE_WEIGHT_USER if role == "user" else _ROLE_WEIGHT_OTHER
         
         # 3. Length importance (çok kısa < 20 char daha az önemli)
         length = len(content)
-        if length < 20:
-            length_weight = 0.5
-        elif length < 50:
-            length_weight = 0.7
+        if length < _SHORT_LENGTH:
+            length_weight = _LENGTH_WEIGHT_SHORT
+        elif length < _MEDIUM_LENGTH:
+            length_weight = _LENGTH_WEIGHT_MEDIUM
         else:
-            length_weight = 1.0
+            length_weight = _LENGTH_WEIGHT_LONG
         
         # 4. Content type importance
         content_weight = 1.0
         
         # Soru işareti var mı? (user'ın sorusu önemli)
         if "?" in content:
-            content_weight = max(content_weight, 1.1)
+            content_weight = max(content_weight, _QUESTION_WEIGHT)
         
         # Kod bloğu var mı? (teknik içerik önemli)
-        if "```" in content or "def " in content or "class " in content:
-            content_weight = max(content_weight, 1.2)
+        if _has_code(content):
+            content_weight = max(content_weight, _CODE_WEIGHT)
         
         # Kritik kelimeler (önemli bilgi içeriyor olabilir)
-        critical_keywords = ["önemli", "kritik", "unutma", "hatırla", "dikkat", "warning", "error"]
-        if any(kw in content.lower() for kw in critical_keywords):
-            content_weight = max(content_weight, 1.15)
+        if _has_critical(content):
+            content_weight = max(content_weight, _CRITICAL_WEIGHT)
         
         # Final importance score
-        importance = (
-            position_weight * 0.4 +
-            role_weight * 0.2 +
-            length_weight * 0.2 +
-            content_weight * 0.2
-        )
+        importance = _combine_importance(position_weight, role_weight, length_weight, content_weight)
         
         return min(1.0, importance)
     
+    @staticmethod
+    def calculate_importance_batch(messages: List[Dict[str, str]]) -> np.ndarray:
+        """
+        Tüm mesajların önem skorlarını tek seferde hesaplar.
+        
+        calculate_message_importance ile aynı skorları üretir; mesaj başına
+        yalnızca özellik çıkarımı (uzunluk, rol, soru/kod/kritik kelime)
+        Python'da yapılır, ağırlıklandırma NumPy ile vektörel hesaplanır.
+        
+        Args:
+            messages: Mesaj listesi (eskiden yeniye)
+            
+        Returns:
+            np.ndarray: Önem skorları (float64, 0.0-1.0)
+        """
+        total = len(messages)
+        if total == 0:
+            return np.empty(0, dtype=np.float64)
+        
+        contents = [msg.get("content", "") for msg in messages]
+        lengths = np.fromiter((len(c) for c in contents), dtype=np.int64, count=total)
+        is_user = np.fromiter((msg.get("role", "user") == "user" for msg in messages), dtype=bool, count=total)
+        has_question = np.fromiter(("?" in c for c in contents), dtype=bool, count=total)
+        has_code = np.fromiter((_has_code(c) for c in contents), dtype=bool, count=total)
+        has_critical = np.fromiter((_has_critical(c) for c in contents), dtype=bool, count=total)
+        
+        position_weight = _POSITION_MIN + (_POSITION_RANGE * np.arange(total, dtype=np.float64) / max(1, total - 1))
+        role_weight = np.where(is_user, _ROLE_WEIGHT_USER, _ROLE_WEIGHT_OTHER)
+        length_weight = np.where(
+            lengths < _SHORT_LENGTH,
+            _LENGTH_WEIGHT_SHORT,
+            np.where(lengths < _MEDIUM_LENGTH, _LENGTH_WEIGHT_MEDIUM, _LENGTH_WEIGHT_LONG),
+        )
+        content_weight = np.maximum.reduce([
+            np.ones(total),
+            np.where(has_question, _QUESTION_WEIGHT, 1.0),
+            np.where(has_code, _CODE_WEIGHT, 1.0),
+            np.where(has_critical, _CRITICAL_WEIGHT, 1.0),
+        ])
+        
+        importance = _combine_importance(position_weight, role_weight, length_weight, content_weight)
+        return np.minimum(1.0, importance)
+    
     @classmethod
     def truncate_messages_by_importance(
         cls,
@@ -147,47 +262,31 @@ class ContextTruncationManager:
             content_messages = messages[1:]
             
             # System token'ını budget'tan düş
-            system_tokens = cls.estimate_tokens(system_msg.get("content", ""))
+            system_tokens = cls.count_tokens(system_msg.get("content", ""))
             token_budget = max(500, token_budget - system_tokens)
         
         if not content_messages:
             return ([system_msg] if system_msg else []), False
         
-        # Her mesaja importance skoru ata
-        scored_messages = []
-        total = len(content_messages)
+        # Her mesaja importance skoru ve token sayısı ata (tek geçiş, dizilere)
+        scores = cls.calculate_importance_batch(content_messages)
+        tokens = np.array(
+            cls.count_tokens_batch([msg.get("content", "") for msg in content_messages]),
+            dtype=np.int64,
+        )
         
-        for idx, msg in enumerate(content_messages):
-            importance = cls.calculate_message_importance(msg, idx, total)
-            tokens = cls.estimate_tokens(msg.get("content", ""))
-            
-            scored_messages.append({
-                "message": msg,
-                "importance": importance,
-                "tokens": tokens,
-                "index": idx
-            })
-        
-        # Importance'a göre sırala (yüksekten düşüğe)
-        scored_messages.sort(key=lambda x: x["importance"], reverse=True)
-        
-        # Budget dahilinde seç
-        selected = []
-        total_tokens = 0
-        
-        for scored in scored_messages:
-            if total_tokens + scored["tokens"] <= token_budget:
-                selected.append(scored)
-                total_tokens += scored["tokens"]
-            else:
-                # Token limiti aşıldı, en önemli mesajları aldık
-                break
+        # Importance'a göre sırala (yüksekten düşüğe, eşitlikte orijinal sıra)
+        order = np.argsort(-scores, kind="stable")
+        
+        # Budget dahilinde seç: sıralı kümülatif token toplamı budget'ı aşana kadar
+        cumulative = np.cumsum(tokens[order])
+        n_selected = int(np.searchsorted(cumulative, token_budget, side="right"))
         
         # Orijinal sıraya geri dön (temporal order)
-        selected.sort(key=lambda x: x["index"])
+        selected = np.sort(order[:n_selected])
         
         # Mesajları çıkar
-        result_messages = [s["message"] for s in selected]
+        result_messages = [content_messages[i] for i in selected]
         
         # Truncation oldu mu?
         was_truncated = len(result_messages) < len(content_messages)
@@ -240,23 +339,26 @@ class ContextTruncationManager:
             return text[:char_limit].rstrip()
         
         # Paragraf boundary'lerinde kes
-        truncated = text[:effective_limit]
+        # rfind(sub, 0, end) orijinal metin üzerinde arar - ara kopya (slice) oluşmaz,
+        # kesim noktası belirlendikten sonra tek bir slice yapılır.
+        cut = effective_limit
         
         # Son paragrafı bul
-        last_para = truncated.rfind("\n\n")
+        last_para = text.rfind("\n\n", 0, effective_limit)
         if last_para > effective_limit * 0.7:  # En az %70'ini aldıysak
-            truncated = truncated[:last_para]
+            cut = last_para
         else:
             # Son cümleyi tamamla
-            last_period = truncated.rfind(".")
-            last_exclaim = truncated.rfind("!")
-            last_question = truncated.rfind("?")
-            
-            last_sentence = max(last_period, last_exclaim, last_question)
+            last_sentence = max(
+                text.rfind(".", 0, effective_limit),
+                text.rfind("!", 0, effective_limit),
+                text.rfind("?", 0, effective_limit),
+            )
             
             if last_sentence > effective_limit * 0.8:  # En az %80'ini aldıysak
-                truncated = truncated[:last_sentence + 1]
+                cut = last_sentence + 1
         
+        truncated = text[:cut]
         truncated = truncated.rstrip()
         
         # Notice ekle
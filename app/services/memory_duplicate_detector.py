@@ -12,10 +12,22 @@ Gelişmiş duplicate detection:
 import logging
 import re
 from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Türkçe stopwords (yaygın kelimeler) - modül yüklenirken bir kez oluşturulur
+_STOPWORDS = frozenset({
+    'bir', 'bu', 'şu', 've', 'veya', 'ile', 'için', 'de', 'da',
+    'mi', 'mı', 'mu', 'mü', 'ki', 'gibi', 'daha', 'çok', 'en',
+    'var', 'yok', 'olan', 'olarak', 'ben', 'sen', 'o', 'biz',
+    'siz', 'onlar', 'benim', 'senin', 'onun', 'bizim', 'sizin'
+})
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\b\w+\b')
+
 
 class MemoryDuplicateDetector:
     """
@@ -36,7 +48,16 @@ class MemoryDuplicateDetector:
     NORMAL_TEXT_THRESHOLD = 0.85
     LOOSE_TEXT_THRESHOLD = 0.70
     
+    # Importance kademeleri: (alt sinir, (semantic, text)) - yuksekten dusuge.
+    # Tuple'lar bir kez olusturulur, her cagrida yeniden kurulmaz.
+    _THRESHOLD_TIERS: Tuple[Tuple[float, Tuple[float, float]], ...] = (
+        (0.8, (STRICT_SEMANTIC_THRESHOLD, STRICT_TEXT_THRESHOLD)),
+        (0.5, (NORMAL_SEMANTIC_THRESHOLD, NORMAL_TEXT_THRESHOLD)),
+    )
+    _LOOSE_THRESHOLDS: Tuple[float, float] = (LOOSE_SEMANTIC_THRESHOLD, LOOSE_TEXT_THRESHOLD)
+    
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_text(text: str) -> str:
         """
         Metni normalize eder (duplicate kontrolü için).
@@ -54,7 +75,7 @@ class MemoryDuplicateDetector:
         normalized = text.lower().strip()
         
         # Çoklu boşlukları tek boşluğa indir
-        normalized = re.sub(r'\s+', ' ', normalized)
+        normalized = _WHITESPACE_RE.sub(' ', normalized)
         
         # Türkçe karakter normalizasyonu
         normalized = normalized.replace("'", "'")
@@ -95,37 +116,31 @@ class MemoryDuplicateDetector:
         return SequenceMatcher(None, t1, t2).ratio()
     
     @staticmethod
-    def extract_key_entities(text: str) -> set:
+    @lru_cache(maxsize=4096)
+    def extract_key_entities(text: str) -> frozenset:
         """
         Metinden anahtar entity'leri çıkarır (basit yaklaşım).
         
         İleri seviye için spaCy kullanılabilir ama dependency eklemeden
         basit regex ile önemli kelimeleri yakalıyoruz.
         
+        Sonuç cache'lenir (duplicate taramasında aynı yeni metin her
+        aday için tekrar analiz edilmez), bu yüzden immutable döner.
+        
         Args:
             text: Analiz edilecek metin
             
         Returns:
-            set: Anahtar kelimeler
+            frozenset: Anahtar kelimeler
         """
-        # Türkçe stopwords (yaygın kelimeler)
-        stopwords = {
-            'bir', 'bu', 'şu', 've', 'veya', 'ile', 'için', 'de', 'da',
-            'mi', 'mı', 'mu', 'mü', 'ki', 'gibi', 'daha', 'çok', 'en',
-            'var', 'yok', 'olan', 'olarak', 'ben', 'sen', 'o', 'biz',
-            'siz', 'onlar', 'benim', 'senin', 'onun', 'bizim', 'sizin'
-        }
-        
         # Normalize
         normalized = MemoryDuplicateDetector.normalize_text(text)
         
         # Kelimelere ayır
-        words = re.findall(r'\b\w+\b', normalized)
+        words = _WORD_RE.findall(normalized)
         
         # Stopwords'leri çıkar ve 3+ karakter olanları al
-        entities = {w for w in words if len(w) >= 3 and w not in stopwords}
-        
-        return entities
+        return frozenset(w for w in words if len(w) >= 3 and w not in _STOPWORDS)
     
     @classmethod
     def get_thresholds_for_importance(
@@ -141,15 +156,12 @@ class MemoryDuplicateDetector:
         Returns:
             Tuple[float, float]: (semantic_threshold, text_threshold)
         """
-        if importance > 0.8:
-            # Yüksek önemli hafızalar için strict
-            return cls.STRICT_SEMANTIC_THRESHOLD, cls.STRICT_TEXT_THRESHOLD
-        elif importance > 0.5:
-            # Orta önemli hafızalar için normal
-            return cls.NORMAL_SEMANTIC_THRESHOLD, cls.NORMAL_TEXT_THRESHOLD
-        else:
-            # Düşük önemli hafızalar için loose
-            return cls.LOOSE_SEMANTIC_THRESHOLD, cls.LOOSE_TEXT_THRESHOLD
+        # Yüksek önemli hafızalar için strict, orta için normal
+        for lower_bound, thresholds in cls._THRESHOLD_TIERS:
+            if importance > lower_bound:
+                return thresholds
+        # Düşük önemli hafızalar için loose
+        return cls._LOOSE_THRESHOLDS
     
     @classmethod
     def is_duplicate(
@@ -166,7 +178,8 @@ class MemoryDuplicateDetector:
         Args:
             new_text: Yeni hafıza metni
             existing_text: Mevcut hafıza metni
-            semantic_distance: ChromaDB vector distance (0.0-2.0)
+            semantic_distance: ChromaDB vector distance (0.0-2.0); birim norm
+                embedding'lerde 1 - (u . v), yani benzerlik = 1 - distance
             importance: Hafıza önem seviyesi (0.0-1.0)
             use_entity_check: Entity kontrolü yap
             
@@ -192,9 +205,9 @@ class MemoryDuplicateDetector:
             existing_entities = cls.extract_key_entities(existing_text)
             
             if new_entities and existing_entities:
-                # Jaccard similarity
+                # Jaccard similarity (birlesim kumesi kurulmadan: |A|+|B|-|A&B|)
                 overlap = len(new_entities & existing_entities)
-                union = len(new_entities | existing_entities)
+                union = len(new_entities) + len(existing_entities) - overlap
                 entity_sim = overlap / union if union > 0 else 0.0
                 
                 # Yüksek semantic ama düşük entity overlap → FARKLI
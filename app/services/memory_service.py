@@ -16,6 +16,12 @@ COLLECTION_NAME = "memories"
 DEFAULT_IMPORTANCE = 0.5
 DEFAULT_TOPIC = "general"
 
+# Embedding'ler ChromaDB'nin varsayilan embedding fonksiyonu ile uretilir ve
+# zaten birim normdadir (L2 = 1). Bu yuzden cosine distance = 1 - (u . v);
+# mesafe HNSW indeksinde (C++) hesaplanir, Python tarafinda norm/sqrt gerekmez.
+# Not: Var olan bir koleksiyonun "hnsw:space" degeri sonradan degistirilemez.
+_COLLECTION_METADATA: Dict[str, Any] = {"hnsw:space": "cosine"}
+
 
 class MemoryRecord(BaseModel):
     """ChromaDB Ã¼zerinde tutulan bir hafÄ±za kaydÄ±nÄ±n uygulama iÃ§i temsili."""
@@ -49,7 +55,7 @@ class MemoryService:
         client = cast(Any, get_chroma_client())
         return client.get_or_create_collection(
             name=COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"},  # Cosine similarity
+            metadata=_COLLECTION_METADATA,  # Cosine similarity
         )
 
     @staticmethod
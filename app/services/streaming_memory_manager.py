@@ -7,11 +7,15 @@ Streaming sırasında memory duplicate'i önlemek için lock mekanizması.
 
 import asyncio
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Set
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Lock shard sayısı (2'nin kuvveti olmalı: hash & mask ile seçilir)
+_LOCK_SHARDS = 64
+
 
 class StreamingMemoryManager:
     """
@@ -19,45 +23,51 @@ class StreamingMemoryManager:
     
     Özellikler:
     - Message ID bazlı deduplication
-    - Lock mekanizması
+    - Message ID'ye göre shard'lanmış lock'lar (farklı ID'ler birbirini beklemez)
     - Timeout ile otomatik cleanup
+    - Tamamlanan ID'ler için sınırlı LRU (bellek sabit kalır)
     """
     
-    def __init__(self):
+    def __init__(self, max_completed: int = 100_000):
         self._processing: Dict[str, datetime] = {}
-        self._completed: Set[str] = set()
+        # Tamamlanan ID'ler - en eski önce; limit aşılınca en eski atılır (O(1))
+        self._completed: "OrderedDict[str, bool]" = OrderedDict()
+        self._max_completed = max_completed
         self._locks: Dict[str, asyncio.Lock] = {}
-        self._lock = asyncio.Lock()
+        # Tek global lock yerine ID hash'ine göre seçilen sabit lock havuzu
+        self._shard_locks: Tuple[asyncio.Lock, ...] = tuple(
+            asyncio.Lock() for _ in range(_LOCK_SHARDS)
+        )
         
         # Cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
     
+    def _lock_for(self, message_id: str) -> asyncio.Lock:
+        """Message ID'nin düştüğü shard lock'unu döndürür (aynı ID -> aynı lock)."""
+        return self._shard_locks[hash(message_id) & (_LOCK_SHARDS - 1)]
+    
     async def _cleanup_old_entries(self):
         """Eski entry'leri temizler (5 dakikadan eski)."""
         while True:
             try:
                 await asyncio.sleep(60)  # Her dakika kontrol et
                 
-                async with self._lock:
-                    now = datetime.utcnow()
-                    timeout = timedelta(minutes=5)
-                    
-                    # Timeout olan processing'leri temizle
-                    expired = [
-                        msg_id for msg_id, start_time in self._processing.items()
-                        if now - start_time > timeout
-                    ]
-                    
-                    for msg_id in expired:
-                        del self._processing[msg_id]
-                        if msg_id in self._locks:
-                            del self._locks[msg_id]
-                        logger.warning(f"[STREAM_MEMORY] Timeout cleanup: {msg_id}")
-                    
-                    # Completed set'i sınırla (son 1000)
-                    if len(self._completed) > 1000:
-                        # En eski 500'ü temizle (set'te sıralama yok, hepsini temizle ve yeniden oluştur)
-                        self._completed.clear()
+                # Blok içinde await yok: event loop üzerinde atomik çalışır,
+                # tüm shard'ları kilitlemeye gerek yok
+                now = datetime.utcnow()
+                timeout = timedelta(minutes=5)
+                
+                # Timeout olan processing'leri temizle
+                expired = [
+                    msg_id for msg_id, start_time in self._processing.items()
+                    if now - start_time > timeout
+                ]
+                
+                for msg_id in expired:
+                    del self._processing[msg_id]
+                    if msg_id in self._locks:
+                        del self._locks[msg_id]
+                    logger.warning(f"[STREAM_MEMORY] Timeout cleanup: {msg_id}")
                         
             except Exception as e:
                 logger.error(f"[STREAM_MEMORY] Cleanup error: {e}")
@@ -77,9 +87,10 @@ class StreamingMemoryManager:
         Returns:
             bool: İşlenebilir ise True
         """
-        async with self._lock:
+        async with self._lock_for(message_id):
             # Zaten tamamlanmış mı?
             if message_id in self._completed:
+                self._completed.move_to_end(message_id)
                 logger.debug(f"[STREAM_MEMORY] Already completed: {message_id}")
                 return False
             
@@ -104,11 +115,14 @@ class StreamingMemoryManager:
         Args:
             message_id: Mesaj ID
         """
-        async with self._lock:
+        async with self._lock_for(message_id):
             if message_id in self._processing:
                 del self._processing[message_id]
             
-            self._completed.add(message_id)
+            self._completed[message_id] = True
+            self._completed.move_to_end(message_id)
+            if len(self._completed) > self._max_completed:
+                self._completed.popitem(last=False)
             
             # Lock'u temizle
             if message_id in self._locks:
@@ -126,7 +140,7 @@ class StreamingMemoryManager:
         Returns:
             asyncio.Lock: Lock nesnesi
         """
-        async with self._lock:
+        async with self._lock_for(message_id):
             if message_id not in self._locks:
                 self._locks[message_id] = asyncio.Lock()
             return self._locks[message_id]
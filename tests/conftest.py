@@ -7,7 +7,9 @@ Test fixture'ları ve ortak yapılandırma.
 
 import os
 import sys
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Dict
 
 import pytest
 
@@ -16,6 +18,34 @@ project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
 
+def pytest_addoption(parser):
+    """Yavaş testleri açmak için komut satırı seçeneği."""
+    parser.addoption(
+        "--runslow",
+        action="store_true",
+        default=False,
+        help="@pytest.mark.slow ile işaretli testleri de çalıştır",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    @pytest.mark.slow testlerini varsayılan olarak atlar.
+
+    Paralel çalıştırma (pytest-xdist):
+        pytest -n auto --dist loadgroup
+
+    @pytest.mark.xdist_group("db") ile işaretli testler aynı worker'da
+    çalışır (SQLite dosyasına eşzamanlı yazma çakışmalarını önler).
+    """
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="Yavaş test - çalıştırmak için --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
 @pytest.fixture(scope="session")
 def app_settings():
     """Test için uygulama ayarlarını döndürür."""
@@ -53,8 +83,72 @@ def sample_code_message():
     return "Python'da liste oluşturma:\n```python\nmy_list = [1, 2, 3]\n```"
 
 
+# =============================================================================
+# ORTAK KULLANICI FIXTURE'LARI
+# =============================================================================
+
+@dataclass(slots=True)
+class MockUser:
+    """
+    Test kullanicisi (User modelinin permission'larda okunan alanlari).
+
+    permissions gercek modeldeki gibi duz bir dict'tir (app kodu
+    isinstance(..., dict) kontrol eder). Paylasimli (session/module scope)
+    kullanicilari testlerde degistirmeyin; degisiklik gerekiyorsa
+    make_user ile yeni bir kullanici olusturun.
+    """
+    id: int = 1
+    username: str = "test_user"
+    role: str = "member"
+    active_persona: str = "standard"
+    is_banned: bool = False
+    bela_unlocked: bool = False
+    permissions: Dict[str, Any] = field(default_factory=dict)
+
+
+@pytest.fixture(scope="session")
+def make_user():
+    """
+    Kullanici factory'si (her cagri yeni, izole bir nesne dondurur).
+
+    Factory durumsuz oldugu icin session-scope; module/class scope'lu
+    fixture'lar da kullanabilir.
+
+    Kullanim:
+        def user(self, make_user):
+            return make_user(role="admin")
+    """
+    def _make(**fields: Any) -> MockUser:
+        return MockUser(**fields)
+
+    return _make
+
 
+@pytest.fixture(scope="session")
+def safe_user():
+    """Gorsel ve internet izni olan normal kullanici (paylasimli)."""
+    return MockUser(permissions={"can_use_image": True, "can_use_internet": True})
 
 
+@pytest.fixture(scope="session")
+def nsfw_user():
+    """NSFW izni (censorship_level=0) olan kullanici (paylasimli)."""
+    return MockUser(permissions={"can_use_image": True, "censorship_level": 0})
 
 
+@pytest.fixture(scope="session")
+def admin_user():
+    """Admin kullanici (paylasimli)."""
+    return MockUser(id=3, username="admin", role="admin")
+
+
+@pytest.fixture(scope="session")
+def banned_user():
+    """Yasakli kullanici (paylasimli)."""
+    return MockUser(id=2, username="banned_user", is_banned=True)
+
+
+@pytest.fixture(scope="session")
+def user_no_image_permission():
+    """Gorsel uretim izni olmayan kullanici (paylasimli)."""
+    return MockUser(permissions={"can_use_image": False})
@@ -34,6 +34,29 @@ class ChatClient:
         # Timeouts - keep conservative
         self.timeout = httpx.Timeout(connect=10.0, read=120.0, write=30.0, pool=10.0)
 
+        # Connection pool - eval boyunca tek client, soketler keep-alive ile tekrar kullanilir
+        # (her turda yeni baglanti / DNS cozumlemesi yapilmaz)
+        self.limits = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            transport = httpx.AsyncHTTPTransport(retries=2, limits=self.limits)
+            self._client = httpx.AsyncClient(timeout=self.timeout, transport=transport)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "ChatClient":
+        self._get_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
     def _cookie_header(self) -> Dict[str, str]:
         if not self.session_token:
             return {}
@@ -58,8 +81,7 @@ class ChatClient:
         headers = {"Content-Type": "application/json", **self._cookie_header()}
 
         start = time.perf_counter()
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.post(self.endpoint, headers=headers, json=payload)
+        resp = await self._get_client().post(self.endpoint, headers=headers, json=payload)
         elapsed_ms = int((time.perf_counter() - start) * 1000)
 
         # Auth failures should be explicit
@@ -1,68 +1,107 @@
 import asyncio
+import hashlib
 import json
+import marshal
 import os
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict
 
 from tests.eval_harness.client import ChatClient
 from tests.eval_harness.judges.rule_based import judge_case
 
 
+def _cache_dir() -> Path:
+    # Kullaniciya ozel cache dizini (paylasimli temp dizini degil), sadece sahibi erisebilir
+    base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    cache_dir = base / "aipro" / "eval"
+    cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return cache_dir
+
+
+def _suite_cache_path(path: str) -> Path:
+    # Cache key: (path, mtime, size) - dosya degisince cache kendiliginden gecersiz olur
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}"
+    digest = hashlib.md5(key.encode("utf-8"), usedforsecurity=False).hexdigest()
+    return _cache_dir() / f"eval_suite_{digest}.marshal"
+
+
 def load_suite(path: str) -> Dict[str, Any]:
+    # Suite saf JSON verisi (dict/list/str/sayi/bool/None); marshal kod calistirmadan okur
+    try:
+        cache = _suite_cache_path(path)
+    except OSError:
+        cache = None  # Cache dizini olusturulamazsa cache'siz devam et
+
+    if cache is not None and cache.exists():
+        try:
+            data = marshal.loads(cache.read_bytes())
+            if isinstance(data, dict):
+                return data
+        except (OSError, EOFError, ValueError, TypeError):
+            pass  # Bozuk cache - JSON'dan tekrar oku
+
     with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        data = json.load(f)
+
+    if cache is not None:
+        try:
+            cache.write_bytes(marshal.dumps(data))
+        except (OSError, ValueError):
+            pass  # Cache yazilamazsa sessizce devam et
+    return data
 
 
 async def run_suite(base_url: str, suite_path: str) -> Dict[str, Any]:
     suite = load_suite(suite_path)
-    client = ChatClient(base_url=base_url)
-
     results = []
-    for model_cfg in suite["models"]:
-        model_id = model_cfg["id"]
-        force_local = bool(model_cfg.get("force_local", False))
-        run_tag = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        for case in suite["cases"]:
-            base_conv_id = case["conversation_id"]
-            conv_id = f"{base_conv_id}__{model_id}__{run_tag}"
-            last_text = ""
-            total_latency = 0
-
-            # Run turns sequentially in same conversation
-            for turn in case["turns"]:
-                resp = await client.chat(
-                    turn["message"],
-                    conversation_id=conv_id,
-                    model=model_id,          # model optional olsa da, evalde sabitliyoruz
-                    force_local=force_local  # local path zorlamak için
+    async with ChatClient(base_url=base_url) as client:
+        for model_cfg in suite["models"]:
+            model_id = model_cfg["id"]
+            force_local = bool(model_cfg.get("force_local", False))
+            run_tag = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            for case in suite["cases"]:
+                base_conv_id = case["conversation_id"]
+                conv_id = f"{base_conv_id}__{model_id}__{run_tag}"
+                last_text = ""
+                total_latency = 0
+
+                # Run turns sequentially in same conversation
+                for turn in case["turns"]:
+                    resp = await client.chat(
+                        turn["message"],
+                        conversation_id=conv_id,
+                        model=model_id,          # model optional olsa da, evalde sabitliyoruz
+                        force_local=force_local  # local path zorlamak için
+                    )
+                    last_text = resp.text
+                    total_latency += resp.latency_ms
+
+                metrics = judge_case(
+                    case=case,
+                    model_output=last_text,
+                    latency_ms=total_latency,
+                    meta={}
                 )
-                last_text = resp.text
-                total_latency += resp.latency_ms
-
-            metrics = judge_case(
-                case=case,
-                model_output=last_text,
-                latency_ms=total_latency,
-                meta={}
-            )
-
-            passed = (
-                metrics.hallucination_flag == 0
-                and metrics.context_adherence == 1
-                and metrics.memory_recall_accuracy == 1
-                and metrics.event_accuracy == 1
-                and metrics.search_quality == 1
-            )
-
-            results.append({
-                "model": model_id,
-                "force_local": force_local,
-                "case_id": case["id"],
-                "conversation_id": conv_id,
-                "passed": passed,
-                "metrics": metrics.to_dict(),
-                "output_preview": last_text[:500]
-            })
+
+                passed = (
+                    metrics.hallucination_flag == 0
+                    and metrics.context_adherence == 1
+                    and metrics.memory_recall_accuracy == 1
+                    and metrics.event_accuracy == 1
+                    and metrics.search_quality == 1
+                )
+
+                results.append({
+                    "model": model_id,
+                    "force_local": force_local,
+                    "case_id": case["id"],
+                    "conversation_id": conv_id,
+                    "passed": passed,
+                    "metrics": metrics.to_dict(),
+                    "output_preview": last_text[:500]
+                })
 
     report = {
         "suite_name": suite.get("suite_name"),
@@ -145,9 +145,9 @@ class TestForgeCircuitBreaker:
         cb.record_failure()
         assert cb.state == CircuitState.OPEN
         
-        # Timeout'tan daha fazla bekle
-        import time
-        time.sleep(1.5)
+        # Timeout'tan daha fazla bekle (sleep yerine saat ileri alınır)
+        opened_at = cb.last_failure_time
+        cb._now = lambda: opened_at + timedelta(seconds=2)
         
         # Şimdi test isteğine izin vermeli
         assert cb.can_attempt() is True
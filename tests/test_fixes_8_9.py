@@ -123,6 +123,7 @@ class TestSafeCallbackExecutor:
         assert executor.get_failed_count() == 0
 
 
+@pytest.mark.xdist_group("db")
 class TestDatabaseConnectionPool:
     """HATA #9: Database connection pool tests"""
     
@@ -198,7 +199,25 @@ class TestDatabaseConnectionPool:
             # 30000ms (30 saniye) olmalı
             assert timeout == 30000
 
+    def test_wal_and_cache_pragmas_configured(self):
+        """WAL modu ve cache PRAGMA'ları configured mi?"""
+        from sqlalchemy import text
+
+        engine = get_engine()
+
+        with engine.connect() as conn:
+            journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+            synchronous = conn.execute(text("PRAGMA synchronous")).scalar()
+            cache_size = conn.execute(text("PRAGMA cache_size")).scalar()
+            temp_store = conn.execute(text("PRAGMA temp_store")).scalar()
+
+            assert str(journal_mode).lower() == "wal"
+            assert synchronous == 1  # NORMAL
+            assert cache_size == -65536  # 64 MiB
+            assert temp_store == 2  # MEMORY
+
 
+@pytest.mark.xdist_group("db")
 class TestIntegration:
     """HATA #8 + #9 integration tests"""
     
@@ -31,52 +31,23 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 class TestCheckpointSelection:
     """Checkpoint secimi testleri."""
     
-    @pytest.fixture
-    def user_with_nsfw_permission(self):
-        """NSFW izni olan kullanici."""
-        class MockUser:
-            id = 1
-            username = "test_user"
-            role = "member"
-            is_banned = False
-            bela_unlocked = False
-            permissions = {
-                "can_use_image": True,
-                "censorship_level": 0,  # UNRESTRICTED
-            }
-        return MockUser()
-    
-    @pytest.fixture
-    def user_without_nsfw_permission(self):
+    @pytest.fixture(scope="module")
+    def user_without_nsfw_permission(self, make_user):
         """NSFW izni olmayan kullanici."""
-        class MockUser:
-            id = 2
-            username = "test_user2"
-            role = "member"
-            is_banned = False
-            bela_unlocked = False
-            permissions = {
+        return make_user(
+            id=2,
+            username="test_user2",
+            permissions={
                 "can_use_image": True,
                 "censorship_level": 1,  # NORMAL
-            }
-        return MockUser()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Admin kullanici."""
-        class MockUser:
-            id = 3
-            username = "admin"
-            role = "admin"
-            is_banned = False
-            permissions = {}
-        return MockUser()
+            },
+        )
     
-    def test_safe_content_uses_standard_checkpoint(self, user_with_nsfw_permission):
+    def test_safe_content_uses_standard_checkpoint(self, nsfw_user):
         """Guvenli icerik standard checkpoint kullanmali."""
         from app.image.routing import CHECKPOINTS, FluxVariant, decide_image_job
         
-        spec = decide_image_job("a cute cat", user_with_nsfw_permission)
+        spec = decide_image_job("a cute cat", nsfw_user)
         
         assert spec.variant == FluxVariant.STANDARD
         assert spec.checkpoint_name == CHECKPOINTS[FluxVariant.STANDARD]
@@ -84,11 +55,11 @@ class TestCheckpointSelection:
         assert spec.blocked is False
         assert "safe_content_using_standard" in spec.reasons
     
-    def test_nsfw_content_with_permission_uses_uncensored(self, user_with_nsfw_permission):
+    def test_nsfw_content_with_permission_uses_uncensored(self, nsfw_user):
         """NSFW icerik + izin var -> uncensored checkpoint."""
         from app.image.routing import CHECKPOINTS, FluxVariant, decide_image_job
         
-        spec = decide_image_job("nude woman", user_with_nsfw_permission)
+        spec = decide_image_job("nude woman", nsfw_user)
         
         assert spec.variant == FluxVariant.UNCENSORED
         assert spec.checkpoint_name == CHECKPOINTS[FluxVariant.UNCENSORED]
@@ -127,21 +98,7 @@ class TestCheckpointSelection:
 class TestNSFWDetection:
     """NSFW tespit testleri."""
     
-    @pytest.fixture
-    def safe_user(self):
-        """NSFW izni olan kullanici."""
-        class MockUser:
-            id = 1
-            username = "test_user"
-            role = "member"
-            is_banned = False
-            permissions = {
-                "can_use_image": True,
-                "censorship_level": 0,
-            }
-        return MockUser()
-    
-    def test_nsfw_keywords_detected(self, safe_user):
+    def test_nsfw_keywords_detected(self, nsfw_user):
         """NSFW kelimeler tespit edilmeli."""
         from app.image.routing import decide_image_job
         
@@ -156,10 +113,10 @@ class TestNSFWDetection:
         ]
         
         for prompt in nsfw_prompts:
-            spec = decide_image_job(prompt, safe_user)
+            spec = decide_image_job(prompt, nsfw_user)
             assert spec.flags["nsfw_detected"] is True, f"Failed for: {prompt}"
     
-    def test_safe_keywords_not_detected(self, safe_user):
+    def test_safe_keywords_not_detected(self, nsfw_user):
         """Guvenli kelimeler NSFW olarak tespit edilmemeli."""
         from app.image.routing import decide_image_job
         
@@ -172,7 +129,7 @@ class TestNSFWDetection:
         ]
         
         for prompt in safe_prompts:
-            spec = decide_image_job(prompt, safe_user)
+            spec = decide_image_job(prompt, nsfw_user)
             assert spec.flags["nsfw_detected"] is False, f"Failed for: {prompt}"
 
 
@@ -183,30 +140,6 @@ class TestNSFWDetection:
 class TestPermissionEnforcement:
     """Izin zorlama testleri."""
     
-    @pytest.fixture
-    def user_no_image_permission(self):
-        """Gorsel uretim izni olmayan kullanici."""
-        class MockUser:
-            id = 1
-            username = "test_user"
-            role = "member"
-            is_banned = False
-            permissions = {
-                "can_use_image": False,
-            }
-        return MockUser()
-    
-    @pytest.fixture
-    def banned_user(self):
-        """Yasakli kullanici."""
-        class MockUser:
-            id = 2
-            username = "banned_user"
-            role = "member"
-            is_banned = True
-            permissions = {}
-        return MockUser()
-    
     def test_no_image_permission_blocked(self, user_no_image_permission):
         """Gorsel uretim izni olmayan kullanici reddedilmeli."""
         from app.image.routing import decide_image_job
@@ -233,19 +166,6 @@ class TestPermissionEnforcement:
 class TestParameters:
     """Parametre testleri."""
     
-    @pytest.fixture
-    def safe_user(self):
-        """Guvenli kullanici."""
-        class MockUser:
-            id = 1
-            username = "test_user"
-            role = "member"
-            is_banned = False
-            permissions = {
-                "can_use_image": True,
-            }
-        return MockUser()
-    
     def test_default_parameters(self, safe_user):
         """Varsayilan parametreler uygulanmali."""
         from app.image.routing import decide_image_job
@@ -295,19 +215,6 @@ class TestParameters:
 class TestSpecToDict:
     """Spec to dict testleri."""
     
-    @pytest.fixture
-    def safe_user(self):
-        """Guvenli kullanici."""
-        class MockUser:
-            id = 1
-            username = "test_user"
-            role = "member"
-            is_banned = False
-            permissions = {
-                "can_use_image": True,
-            }
-        return MockUser()
-    
     def test_to_dict_conversion(self, safe_user):
         """to_dict() dogru cevirmeli."""
         from app.image.routing import decide_image_job
@@ -13,15 +13,30 @@ from typing import Dict, List
 
 import pytest
 
+from app.services.context_truncation_manager import context_manager as _context_manager
+from app.services.memory_duplicate_detector import detector as _detector
+
+
+@pytest.fixture(scope="module")
+def detector():
+    """Duplicate detector singleton'ı (modül başına bir kez çözülür)."""
+    return _detector
+
+
+@pytest.fixture(scope="module")
+def context_manager():
+    """Context truncation manager singleton'ı (modül başına bir kez çözülür)."""
+    return _context_manager
+
+
 # HATA #4: Memory Duplicate Detection Tests
 # ==========================================
 
 class TestMemoryDuplicateDetection:
     """Hybrid duplicate detection testleri."""
     
-    def test_text_similarity_exact_match(self):
+    def test_text_similarity_exact_match(self, detector):
         """Exact match testi."""
-        from app.services.memory_duplicate_detector import detector
         
         text1 = "Kedimin adı Pamuk"
         text2 = "Kedimin adı Pamuk"
@@ -29,9 +44,8 @@ class TestMemoryDuplicateDetection:
         similarity = detector.calculate_text_similarity(text1, text2)
         assert similarity == 1.0, "Exact match %100 olmalı"
     
-    def test_text_similarity_different(self):
+    def test_text_similarity_different(self, detector):
         """Farklı metinler testi."""
-        from app.services.memory_duplicate_detector import detector
         
         text1 = "Kedimin adı Pamuk"
         text2 = "Köpeğimin adı Karabaş"
@@ -39,9 +53,8 @@ class TestMemoryDuplicateDetection:
         similarity = detector.calculate_text_similarity(text1, text2)
         assert similarity < 0.7, "Farklı metinler düşük similarity olmalı"
     
-    def test_normalization(self):
+    def test_normalization(self, detector):
         """Metin normalizasyonu testi."""
-        from app.services.memory_duplicate_detector import detector
         
         text1 = "  Kullanıcı   adı:   Ahmet  "
         text2 = "kullanıcı ismi: ahmet"
@@ -54,9 +67,8 @@ class TestMemoryDuplicateDetection:
         similarity = detector.calculate_text_similarity(text1, text2)
         assert similarity > 0.7, "Normalizasyon sonrası benzer olmalı"
     
-    def test_entity_extraction(self):
+    def test_entity_extraction(self, detector):
         """Entity çıkarma testi."""
-        from app.services.memory_duplicate_detector import detector
         
         text = "Kedimin adı Pamuk ve 3 yaşında"
         entities = detector.extract_key_entities(text)
@@ -65,10 +77,8 @@ class TestMemoryDuplicateDetection:
         assert len(entities) >= 2, "En az 2 entity bulunmalı"
         assert any("pamuk" in e.lower() for e in entities), "'Pamuk' entity'si bulunmalı"
     
-    def test_duplicate_false_positive_prevention(self):
+    def test_duplicate_false_positive_prevention(self, detector):
         """False positive önleme testi - Kritik!"""
-        from app.services.memory_duplicate_detector import detector
-
         # Yüksek semantic ama farklı entity'ler
         text1 = "Kedimi çok seviyorum"
         text2 = "Köpeğimi çok seviyorum"
@@ -88,10 +98,8 @@ class TestMemoryDuplicateDetection:
         assert not is_dup, f"False positive! Reason: {reason}"
         assert "entity_mismatch" in reason or "not_duplicate" in reason
     
-    def test_duplicate_true_positive(self):
+    def test_duplicate_true_positive(self, detector):
         """True positive testi."""
-        from app.services.memory_duplicate_detector import detector
-
         # Çok benzer metinler (exact match'e yakın)
         text1 = "İsmim Ahmet ve yazılım mühendisiyim"
         text2 = "İsmim Ahmet ve yazılım mühendisiyim"
@@ -110,10 +118,8 @@ class TestMemoryDuplicateDetection:
         # Çok yüksek similarity, duplicate olmalı
         assert is_dup, f"True duplicate tespit edilmeli! Reason: {reason}"
     
-    def test_importance_based_thresholds(self):
+    def test_importance_based_thresholds(self, detector):
         """Importance bazlı threshold testi."""
-        from app.services.memory_duplicate_detector import detector
-
         # Yüksek importance = strict threshold
         sem_threshold_high, text_threshold_high = detector.get_thresholds_for_importance(0.9)
         
@@ -181,6 +187,33 @@ class TestStreamingMemoryManager:
         can_process = await manager.can_process_memory(message_id)
         assert not can_process, "Tamamlanmış mesaj tekrar işlenmemeli"
     
+    @pytest.mark.asyncio
+    async def test_completed_ids_bounded(self):
+        """Tamamlanan ID kaydı sınırlı kalmalı (en eski atılır)."""
+        from app.services.streaming_memory_manager import StreamingMemoryManager
+        
+        manager = StreamingMemoryManager(max_completed=3)
+        
+        for i in range(5):
+            message_id = f"test-msg-bounded-{i}"
+            await manager.can_process_memory(message_id)
+            await manager.mark_completed(message_id)
+        
+        assert len(manager._completed) == 3
+        # En yeni ID hâlâ engelli, en eski ID unutulmuş
+        assert not await manager.can_process_memory("test-msg-bounded-4")
+        assert await manager.can_process_memory("test-msg-bounded-0")
+    
+    def test_lock_shards_by_message_id(self):
+        """Aynı ID aynı lock'u, farklı ID'ler farklı shard'ları kullanmalı."""
+        from app.services.streaming_memory_manager import StreamingMemoryManager
+        
+        manager = StreamingMemoryManager()
+        
+        assert manager._lock_for("msg-a") is manager._lock_for("msg-a")
+        used = {id(manager._lock_for(f"msg-{i}")) for i in range(200)}
+        assert len(used) > 1
+    
     @pytest.mark.asyncio
     async def test_concurrent_lock(self):
         """Concurrent lock testi."""
@@ -217,9 +250,15 @@ class TestStreamingMemoryManager:
 class TestContextTruncationManager:
     """Importance-based context truncation testleri."""
     
-    def test_token_estimation(self):
+    def test_counter_matches_processor_estimate(self, context_manager):
+        """Budget sayacı processor._estimate_tokens ile aynı birimi kullanmalı."""
+        from app.chat.processor import _estimate_tokens
+        
+        texts = ["Bu bir test metnidir.", "", "A" * 200, "Güneşli çiçekler 🌍"]
+        assert context_manager.count_tokens_batch(texts) == [_estimate_tokens(t) for t in texts]
+    
+    def test_token_estimation(self, context_manager):
         """Token tahmini testi."""
-        from app.services.context_truncation_manager import context_manager
         
         text = "Bu bir test metnidir."  # ~20 karakter
         tokens = context_manager.estimate_tokens(text)
@@ -227,9 +266,17 @@ class TestContextTruncationManager:
         # 20 char / 4 = 5 token
         assert 4 <= tokens <= 6, f"Token tahmini yanlış: {tokens}"
     
-    def test_message_importance_position(self):
+    def test_token_estimation_counts_utf8_bytes(self, context_manager):
+        """Çok byte'lı karakterler (Türkçe, emoji) daha fazla token sayılmalı."""
+        ascii_text = "Gunesli cicekler"
+        turkish_text = "Güneşli çiçekler"
+        
+        assert context_manager.estimate_tokens(ascii_text) == len(ascii_text) // 4
+        assert context_manager.estimate_tokens(turkish_text) > context_manager.estimate_tokens(ascii_text)
+        assert context_manager.count_tokens("") == 0
+    
+    def test_message_importance_position(self, context_manager):
         """Position-based importance testi."""
-        from app.services.context_truncation_manager import context_manager
         
         message = {"role": "user", "content": "Test mesajı"}
         
@@ -241,9 +288,8 @@ class TestContextTruncationManager:
         
         assert importance_new > importance_old, "Yeni mesajlar daha önemli olmalı"
     
-    def test_message_importance_role(self):
+    def test_message_importance_role(self, context_manager):
         """Role-based importance testi."""
-        from app.services.context_truncation_manager import context_manager
         
         user_msg = {"role": "user", "content": "Kullanıcı sorusu?"}
         assistant_msg = {"role": "assistant", "content": "Bot cevabı"}
@@ -253,9 +299,8 @@ class TestContextTruncationManager:
         
         assert user_importance > assistant_importance, "User mesajları daha önemli olmalı"
     
-    def test_message_importance_content_type(self):
+    def test_message_importance_content_type(self, context_manager):
         """Content type importance testi."""
-        from app.services.context_truncation_manager import context_manager
         
         question_msg = {"role": "user", "content": "Python'da liste nasıl oluşturulur?"}
         code_msg = {"role": "user", "content": "```python\nlist = [1, 2, 3]\n```"}
@@ -270,10 +315,24 @@ class TestContextTruncationManager:
         assert code_importance > 0.5
         assert critical_importance > 0.5
     
-    def test_truncate_messages_by_importance(self):
+    def test_importance_batch_matches_single(self, context_manager):
+        """Toplu skorlama tek tek hesaplamayla aynı sonucu vermeli."""
+        messages = [
+            {"role": "user", "content": "Merhaba"},
+            {"role": "assistant", "content": "Python'da liste nasıl oluşturulur?"},
+            {"role": "user", "content": "```python\nlist = [1, 2, 3]\n```"},
+            {"role": "assistant", "content": "ÖNEMLİ: Bu kodu unutma! " + "A" * 60},
+        ]
+        
+        batch = context_manager.calculate_importance_batch(messages)
+        
+        assert list(batch) == [
+            context_manager.calculate_message_importance(msg, idx, len(messages))
+            for idx, msg in enumerate(messages)
+        ]
+    
+    def test_truncate_messages_by_importance(self, context_manager):
         """Importance-based message truncation testi."""
-        from app.services.context_truncation_manager import context_manager
-
         # Daha uzun mesajlar ile test
         long_content = "A" * 200  # Her biri ~50 token
         messages = [
@@ -301,9 +360,8 @@ class TestContextTruncationManager:
         code_preserved = any("```python" in msg.get("content", "") for msg in truncated)
         assert code_preserved, "Kod bloğu korunmalı (yüksek importance)"
     
-    def test_truncate_text_smart_paragraph_boundary(self):
+    def test_truncate_text_smart_paragraph_boundary(self, context_manager):
         """Paragraph boundary'de kesme testi."""
-        from app.services.context_truncation_manager import context_manager
         
         text = (
             "İlk paragraf burada. Bu çok önemli bilgi.\n\n"
@@ -316,9 +374,8 @@ class TestContextTruncationManager:
         # Paragraf ortasından kesmemeli
         assert "\n\n" in truncated or truncated.endswith("."), "Paragraf boundary'de kesmeli"
     
-    def test_truncate_text_smart_sentence_completion(self):
+    def test_truncate_text_smart_sentence_completion(self, context_manager):
         """Cümle tamamlama testi."""
-        from app.services.context_truncation_manager import context_manager
         
         text = "Bu bir test cümlesidir. Bu ikinci cümledir. Bu üçüncü cümledir."
         
@@ -335,6 +392,7 @@ class TestContextTruncationManager:
 class TestIntegration:
     """Entegrasyon testleri."""
     
+    @pytest.mark.slow
     @pytest.mark.asyncio
     async def test_memory_service_with_hybrid_detection(self):
         """Memory service + hybrid detection entegrasyonu."""
@@ -346,6 +404,7 @@ class TestIntegration:
         # Test placeholder
         assert True, "Integration test - ChromaDB ile test edilmeli"
     
+    @pytest.mark.integration
     def test_processor_context_truncation(self):
         """Processor + context truncation entegrasyonu."""
         from app.chat.processor import _truncate_context_text
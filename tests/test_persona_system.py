@@ -14,70 +14,89 @@ Calistirma:
     pytest tests/test_persona_system.py -v
 """
 
-import os
-import sys
-
 import pytest
 
-# Proje rootunu path'e ekle
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.ai.prompts.compiler import build_system_prompt
+from app.ai.prompts.image_guard import (
+    get_forbidden_tokens_in_prompt,
+    sanitize_image_prompt,
+    validate_prompt_minimal,
+)
+from app.auth.permissions import (
+    can_generate_nsfw_image,
+    user_can_use_image,
+    user_can_use_internet,
+    user_can_use_local,
+)
+from app.chat.processor import _image_prefix_len
+from app.chat.smart_router import RoutingTarget, SmartRouter, ToolIntent
 
 
 # =============================================================================
 # TEST 1: IMAGE GUARD - FORBIDDEN TOKEN TEMIZLEME
 # =============================================================================
 
+# (generated_prompt, user_original, must_remove, must_keep)
+FORBIDDEN_CASES = [
+    # Kullanici istemedigi forbidden tokenlar kaldirilmali
+    (
+        "A cute fluffy cat, 8k, masterpiece, photorealistic, cinematic",
+        "kedi çiz",
+        ["8k", "masterpiece", "photorealistic", "cinematic"],
+        ["cat"],
+    ),
+    # Kullanici istedigi tokenlar (anime) kaldirilmamali
+    (
+        "A cute anime cat, 8k, masterpiece",
+        "anime kedi çiz",
+        ["8k", "masterpiece"],
+        ["anime"],
+    ),
+    # Birden fazla forbidden token temizlenmeli
+    (
+        "A majestic eagle, 8k, 4k, hdr, ultra hd, masterpiece, best quality, highly detailed, "
+        "photorealistic, cinematic, trending on artstation",
+        "kartal ciz",
+        ["8k", "4k", "hdr", "masterpiece", "photorealistic", "cinematic", "artstation"],
+        ["eagle"],
+    ),
+    # Cok kelimeli token tek parca kaldirilmali, noktali virgul de temizlenmeli
+    (
+        "A dog; cinematic lighting; running, 8k",
+        "kopek ciz",
+        ["cinematic", "lighting", "8k"],
+        ["dog", "running"],
+    ),
+]
+
+# (prompt, is_minimal)
+MINIMAL_CASES = [
+    ("A cute cat sitting on a windowsill", True),
+    ("A cute cat, 8k, masterpiece", False),
+    ("cinematic lighting on a cat", False),
+]
+
+
 class TestImageGuard:
     """Forbidden Token Guard testleri."""
     
-    def test_forbidden_tokens_removed(self):
-        """Kullanici istemedigi forbidden tokenlar kaldirilmali."""
-        from app.ai.prompts.image_guard import sanitize_image_prompt
-        
-        generated = "A cute fluffy cat, 8k, masterpiece, photorealistic, cinematic"
-        user_original = "kedi çiz"
-        
-        result = sanitize_image_prompt(generated, user_original)
-        
-        # Forbidden tokenlar kaldirilmali
-        assert "8k" not in result.lower()
-        assert "masterpiece" not in result.lower()
-        assert "photorealistic" not in result.lower()
-        assert "cinematic" not in result.lower()
-        
-        # Ana icerik kalmali
-        assert "cat" in result.lower() or "cute" in result.lower()
-    
-    def test_user_requested_tokens_kept(self):
-        """Kullanici istedigi tokenlar kaldirilmamali."""
-        from app.ai.prompts.image_guard import sanitize_image_prompt
-        
-        generated = "A cute anime cat, 8k, masterpiece"
-        user_original = "anime kedi çiz"  # Kullanici anime istedi
-        
-        result = sanitize_image_prompt(generated, user_original)
-        
-        # anime kaldirilmamali (kullanici istedi)
-        assert "anime" in result.lower()
-        # 8k ve masterpiece kaldirilmali (kullanici istemedi)
-        assert "8k" not in result.lower()
-        assert "masterpiece" not in result.lower()
+    @pytest.mark.parametrize("generated,user_original,must_remove,must_keep", FORBIDDEN_CASES)
+    def test_sanitize(self, generated, user_original, must_remove, must_keep):
+        """Kullanicinin istemedigi tokenlar kaldirilmali, ana icerik kalmali."""
+        result = sanitize_image_prompt(generated, user_original).lower()
+        
+        for token in must_remove:
+            assert token not in result, f"'{token}' should be removed"
+        for token in must_keep:
+            assert token in result, f"'{token}' should be kept"
     
-    def test_validate_prompt_minimal(self):
+    @pytest.mark.parametrize("prompt,expected", MINIMAL_CASES)
+    def test_validate_prompt_minimal(self, prompt, expected):
         """validate_prompt_minimal fonksiyonu dogru calismalı."""
-        from app.ai.prompts.image_guard import validate_prompt_minimal
-
-        # Temiz prompt
-        assert validate_prompt_minimal("A cute cat sitting on a windowsill") is True
-        
-        # Forbidden token iceren prompt
-        assert validate_prompt_minimal("A cute cat, 8k, masterpiece") is False
-        assert validate_prompt_minimal("cinematic lighting on a cat") is False
+        assert validate_prompt_minimal(prompt) is expected
     
     def test_get_forbidden_tokens_in_prompt(self):
         """get_forbidden_tokens_in_prompt forbidden tokenlari bulmali."""
-        from app.ai.prompts.image_guard import get_forbidden_tokens_in_prompt
-        
         prompt = "A beautiful cat, 8k, masterpiece, cinematic"
         found = get_forbidden_tokens_in_prompt(prompt)
         
@@ -88,117 +107,69 @@ class TestImageGuard:
     
     def test_empty_prompt(self):
         """Bos prompt hata vermemeli."""
-        from app.ai.prompts.image_guard import sanitize_image_prompt
-        
         result = sanitize_image_prompt("", "test")
         assert result == ""
         
         result = sanitize_image_prompt("A cat", "")
         assert "cat" in result.lower()
-    
-    def test_multiple_forbidden_tokens(self):
-        """Birden fazla forbidden token temizlenmeli."""
-        from app.ai.prompts.image_guard import sanitize_image_prompt
-        
-        generated = "A majestic eagle, 8k, 4k, hdr, ultra hd, masterpiece, best quality, highly detailed, photorealistic, cinematic, trending on artstation"
-        user_original = "kartal ciz"
-        
-        result = sanitize_image_prompt(generated, user_original)
-        
-        # Tum forbidden tokenlar kaldirilmali
-        forbidden_check = ["8k", "4k", "hdr", "masterpiece", "photorealistic", "cinematic", "artstation"]
-        for token in forbidden_check:
-            assert token not in result.lower(), f"'{token}' should be removed"
-        
-        # Ana icerik kalmali
-        assert "eagle" in result.lower()
 
 
 # =============================================================================
 # TEST 2: SMART ROUTER + PERSONA
 # =============================================================================
 
+# (message, expected RoutingTarget, expected ToolIntent)
+ROUTER_CASES = [
+    ("kedi resmi çiz", RoutingTarget.IMAGE, ToolIntent.IMAGE),
+    ("hava bugün nasıl", RoutingTarget.INTERNET, ToolIntent.INTERNET),
+    # Tool intent persona gereksinimlerinden oncelikli olmali
+    ("bir kedi çiz bana", RoutingTarget.IMAGE, ToolIntent.IMAGE),
+]
+
+
 class TestSmartRouterPersona:
     """SmartRouter persona entegrasyonu testleri."""
     
-    @pytest.fixture
-    def mock_user_with_local(self):
+    @pytest.fixture(scope="module")
+    def mock_user_with_local(self, make_user):
         """Local izni olan kullanici."""
-        class MockUser:
-            id = 1
-            username = "test_user"
-            role = "member"
-            active_persona = "romantic"
-            is_banned = False
-            bela_unlocked = True  # Local model izni
-            permissions = {
+        return make_user(
+            active_persona="romantic",
+            bela_unlocked=True,  # Local model izni
+            permissions={
                 "can_use_internet": True,
                 "can_use_image": True,
-            }
-        return MockUser()
+            },
+        )
     
-    @pytest.fixture
-    def mock_user_without_local(self):
+    @pytest.fixture(scope="module")
+    def mock_user_without_local(self, make_user):
         """Local izni olmayan kullanici."""
-        class MockUser:
-            id = 2
-            username = "test_user2"
-            role = "member"
-            active_persona = "standard"
-            is_banned = False
-            bela_unlocked = False
-            permissions = {
+        return make_user(
+            id=2,
+            username="test_user2",
+            permissions={
                 "can_use_internet": True,
                 "can_use_image": True,
-            }
-        return MockUser()
-    
-    @pytest.fixture
-    def mock_admin(self):
-        """Admin kullanici."""
-        class MockUser:
-            id = 3
-            username = "admin"
-            role = "admin"
-            active_persona = "standard"
-            is_banned = False
-            permissions = {}
-        return MockUser()
-    
-    def test_romantic_persona_with_image_request(self, mock_user_with_local):
-        """romantic persona + 'kedi resmi çiz' → Target=image, Tool=image."""
-        from app.chat.smart_router import RoutingTarget, SmartRouter, ToolIntent
-        
-        router = SmartRouter()
-        
-        decision = router.route(
-            message="kedi resmi çiz",
-            user=mock_user_with_local,
-            persona_name="romantic"
+            },
         )
-        
-        assert decision.target == RoutingTarget.IMAGE
-        assert decision.tool_intent == ToolIntent.IMAGE
     
-    def test_romantic_persona_with_web_request(self, mock_user_with_local):
-        """romantic persona + 'hava bugün nasıl' → Target=internet, Tool=internet."""
-        from app.chat.smart_router import RoutingTarget, SmartRouter, ToolIntent
-        
+    @pytest.mark.parametrize("message,expected_target,expected_tool", ROUTER_CASES)
+    def test_romantic_persona_tool_routing(self, mock_user_with_local, message, expected_target, expected_tool):
+        """romantic persona + tool istegi → Target/Tool persona'dan bagimsiz dogru secilmeli."""
         router = SmartRouter()
         
         decision = router.route(
-            message="hava bugün nasıl",
+            message=message,
             user=mock_user_with_local,
-            persona_name="romantic"
+            persona_name="romantic"  # requires_uncensored
         )
         
-        assert decision.target == RoutingTarget.INTERNET
-        assert decision.tool_intent == ToolIntent.INTERNET
+        assert decision.target == expected_target
+        assert decision.tool_intent == expected_tool
     
     def test_romantic_persona_with_chat(self, mock_user_with_local):
         """romantic persona + 'selam' → Tool=none, local veya groq."""
-        from app.chat.smart_router import SmartRouter, ToolIntent
-        
         router = SmartRouter()
         
         decision = router.route(
@@ -212,29 +183,10 @@ class TestSmartRouterPersona:
         # Persona bilgisi olmali
         assert decision.persona_name == "romantic"
     
-    def test_tool_priority_over_persona(self, mock_user_with_local):
-        """Tool intent persona gereksinimlerinden oncelikli olmali."""
-        from app.chat.smart_router import RoutingTarget, SmartRouter, ToolIntent
-        
-        router = SmartRouter()
-        
-        # requires_uncensored=True olan persona ile image request
-        decision = router.route(
-            message="bir kedi çiz bana",
-            user=mock_user_with_local,
-            persona_name="romantic"  # requires_uncensored
-        )
-        
-        # IMAGE tool calismali (persona'dan bagimsiz)
-        assert decision.target == RoutingTarget.IMAGE
-        assert decision.tool_intent == ToolIntent.IMAGE
-    
-    def test_admin_always_has_access(self, mock_admin):
+    def test_admin_always_has_access(self, admin_user):
         """Admin kullanici tum ozelliklere erisebilmeli."""
-        from app.auth.permissions import can_generate_nsfw_image, user_can_use_local
-        
-        assert user_can_use_local(mock_admin) is True
-        assert can_generate_nsfw_image(mock_admin) is True
+        assert user_can_use_local(admin_user) is True
+        assert can_generate_nsfw_image(admin_user) is True
 
 
 # =============================================================================
@@ -244,39 +196,25 @@ class TestSmartRouterPersona:
 class TestPersonaSelection:
     """Persona secimi ve izin testleri."""
     
-    @pytest.fixture
-    def mock_user_with_local(self):
+    @pytest.fixture(scope="module")
+    def mock_user_with_local(self, make_user):
         """Local izni olan kullanici."""
-        class MockUser:
-            id = 1
-            username = "test_user"
-            role = "member"
-            active_persona = "standard"
-            is_banned = False
-            bela_unlocked = True  # Local model izni icin bela_unlocked kullan
-            permissions = {}
-        return MockUser()
+        return make_user(bela_unlocked=True)  # Local model izni icin bela_unlocked kullan
     
-    @pytest.fixture
-    def mock_user_without_local(self):
+    @pytest.fixture(scope="module")
+    def mock_user_without_local(self, make_user):
         """Local izni olmayan kullanici."""
-        class MockUser:
-            id = 2
-            username = "test_user2"
-            role = "member"
-            active_persona = "standard"
-            is_banned = False
-            bela_unlocked = False
-            permissions = {
+        return make_user(
+            id=2,
+            username="test_user2",
+            permissions={
                 "can_use_local_chat": False,
                 "allow_local_model": False,
-            }
-        return MockUser()
+            },
+        )
     
     def test_requires_uncensored_with_local_permission(self, mock_user_with_local):
         """requires_uncensored persona: local izni var → izin verilmeli."""
-        from app.auth.permissions import user_can_use_local
-
         # Kullanici local kullanabilir (bela_unlocked=True)
         assert user_can_use_local(mock_user_with_local) is True
         
@@ -285,8 +223,6 @@ class TestPersonaSelection:
     
     def test_requires_uncensored_without_local_permission(self, mock_user_without_local):
         """requires_uncensored persona: local izni yok → reddedilmeli."""
-        from app.auth.permissions import user_can_use_local
-
         # Kullanici local kullanamaz (bela_unlocked=False)
         assert user_can_use_local(mock_user_without_local) is False
         
@@ -303,8 +239,6 @@ class TestPromptCompiler:
     
     def test_build_system_prompt_basic(self):
         """Temel system prompt uretimi."""
-        from app.ai.prompts.compiler import build_system_prompt
-        
         prompt = build_system_prompt(
             user=None,
             persona_name="standard",
@@ -317,8 +251,6 @@ class TestPromptCompiler:
     
     def test_build_system_prompt_with_toggles(self):
         """Toggle context'leri prompt'a eklenmeli."""
-        from app.ai.prompts.compiler import build_system_prompt
-
         # Web enabled
         prompt_web_on = build_system_prompt(
             user=None,
@@ -342,72 +274,69 @@ class TestPromptCompiler:
 # TEST 5: PERMISSION HELPERS
 # =============================================================================
 
+# (user fixture adi, beklenen (local, internet, image, nsfw_image) snapshot'i)
+PERMISSION_CASES = [
+    ("admin_user", (True, True, True, True)),
+    ("regular_user", (False, False, False, False)),
+]
+
+
+def _perm_snapshot(user):
+    """Kullanicinin tum permission predicate sonuclarini tek tuple olarak dondurur."""
+    return (
+        user_can_use_local(user),
+        user_can_use_internet(user),
+        user_can_use_image(user),
+        can_generate_nsfw_image(user),
+    )
+
+
 class TestPermissionHelpers:
     """Permission helper fonksiyon testleri."""
     
-    @pytest.fixture
-    def admin_user(self):
-        """Admin kullanici."""
-        class MockUser:
-            id = 1
-            role = "admin"
-            permissions = {}
-        return MockUser()
-    
-    @pytest.fixture
-    def regular_user(self):
+    @pytest.fixture(scope="module")
+    def regular_user(self, make_user):
         """Normal kullanici."""
-        class MockUser:
-            id = 2
-            role = "member"
-            permissions = {
+        return make_user(
+            id=2,
+            permissions={
                 "can_use_local": False,
                 "can_use_internet": False,
                 "can_use_image": False,
-            }
-        return MockUser()
-    
-    def test_admin_bypasses_all_restrictions(self, admin_user):
-        """Admin tum kisitlamalari gecmeli."""
-        from app.auth.permissions import (
-            can_generate_nsfw_image,
-            user_can_use_image,
-            user_can_use_internet,
-            user_can_use_local,
+            },
         )
-        
-        assert user_can_use_local(admin_user) is True
-        assert user_can_use_internet(admin_user) is True
-        assert user_can_use_image(admin_user) is True
-        assert can_generate_nsfw_image(admin_user) is True
     
-    def test_regular_user_respects_permissions(self, regular_user):
-        """Normal kullanici izinlere bagli olmali."""
-        from app.auth.permissions import (
-            user_can_use_image,
-            user_can_use_internet,
-            user_can_use_local,
-        )
+    @pytest.mark.parametrize(
+        "user_fixture,expected", PERMISSION_CASES, ids=[u for u, _ in PERMISSION_CASES]
+    )
+    def test_permission_snapshot(self, request, user_fixture, expected):
+        """Admin tum kisitlamalari gecmeli, normal kullanici izinlere bagli olmali."""
+        user = request.getfixturevalue(user_fixture)
         
-        assert user_can_use_local(regular_user) is False
-        assert user_can_use_internet(regular_user) is False
-        assert user_can_use_image(regular_user) is False
+        assert _perm_snapshot(user) == expected
 
 
 # =============================================================================
 # TEST 6: IMAGE PROMPT PREFIX SYSTEM
 # =============================================================================
 
+# (mesaj, prefix uzunlugu, prefix sonrasi prompt)
+PREFIX_CASES = [
+    ("!a cat", 1, "a cat"),
+    ("!!anime cat", 2, "anime cat"),
+    ("kedi çiz", 0, "kedi çiz"),
+    ("!", 1, ""),
+    ("!!", 2, ""),
+    ("", 0, ""),
+]
+
+
 class TestImagePromptPrefix:
     """Image prompt prefix (! ve !!) testleri."""
     
-    @pytest.mark.asyncio
-    async def test_single_bang_raw_prompt(self):
+    def test_single_bang_raw_prompt(self):
         """!prefix: raw prompt + guard açık."""
-        # Bu test için mock gerekiyor çünkü async fonksiyon
         # Basit unit test olarak sanitize_image_prompt'u test edelim
-        from app.ai.prompts.image_guard import sanitize_image_prompt
-
         # "!a cat" -> "a cat" (forbidden token yok, değişmemeli)
         raw_input = "a cat"
         result = sanitize_image_prompt(raw_input, raw_input)
@@ -415,8 +344,6 @@ class TestImagePromptPrefix:
     
     def test_single_bang_with_forbidden_token(self):
         """!prefix + forbidden token: guard temizlemeli."""
-        from app.ai.prompts.image_guard import sanitize_image_prompt
-
         # "!a cat 8k masterpiece" -> guard açık, forbidden tokenlar temizlenmeli
         raw_input = "a cat 8k masterpiece"
         user_original = raw_input  # ! ile girildiğinde user_original = prompt
@@ -430,8 +357,6 @@ class TestImagePromptPrefix:
     
     def test_double_bang_bypasses_guard(self):
         """!!prefix: guard KAPALI - anime gibi tokenlar kalmalı."""
-        from app.ai.prompts.image_guard import sanitize_image_prompt, validate_prompt_minimal
-
         # "!!anime cat" -> guard kapalı olduğunda "anime" kalmalı
         # Bu durumda sanitize_image_prompt çağrılmaz, direkt prompt kullanılır
         # validate_prompt_minimal ile kontrol edelim
@@ -455,36 +380,11 @@ class TestImagePromptPrefix:
         expected = raw_prompt  # Hiçbir değişiklik olmamalı
         assert expected == raw_prompt
     
-    def test_prefix_extraction(self):
-        """Prefix doğru çıkarılmalı."""
-        # ! prefix
-        msg1 = "!a cat"
-        assert msg1.startswith("!")
-        assert not msg1.startswith("!!")
-        assert msg1[1:].strip() == "a cat"
-        
-        # !! prefix
-        msg2 = "!!anime cat"
-        assert msg2.startswith("!!")
-        assert msg2[2:].strip() == "anime cat"
-        
-        # Normal (prefix yok)
-        msg3 = "kedi çiz"
-        assert not msg3.startswith("!")
-    
-    def test_empty_after_prefix(self):
-        """Prefix sonrası boş string durumu."""
-        from app.ai.prompts.image_guard import sanitize_image_prompt
-
-        # "!" tek başına
-        msg = "!"
-        prompt = msg[1:].strip() or msg[1:]
-        assert prompt == ""
-        
-        # "!!" tek başına  
-        msg2 = "!!"
-        prompt2 = msg2[2:].strip() or msg2[2:]
-        assert prompt2 == ""
+    @pytest.mark.parametrize("message,prefix_len,prompt", PREFIX_CASES)
+    def test_prefix_extraction(self, message, prefix_len, prompt):
+        """Prefix doğru çıkarılmalı (prefix sonrası boş string dahil)."""
+        assert _image_prefix_len(message) == prefix_len
+        assert message[prefix_len:].strip() == prompt
 
 
 if __name__ == "__main__":
@@ -7,24 +7,28 @@ Professional Output Tests
 Shaper, formatter ve output contract davranışlarını test eder.
 """
 
+from functools import cache, lru_cache
 from typing import Any, Dict
 
 import pytest
 
+from app.plugins.response_enhancement.config import EnhancementConfig
+from app.services.response_processor import full_post_process, get_preset_config
+from app.services.tool_output_formatter import format_web_result
+
 # =============================================================================
 # TEST FIXTURES
 # =============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def formatter():
     """Tool output formatter fixture."""
-    from app.services.tool_output_formatter import format_web_result
     return format_web_result
 
 
-@pytest.fixture
-def shaper():
-    """Answer shaper fixture."""
+@cache
+def _resolve_shaper():
+    """Shaper implementasyonunu bir kez cozer (opsiyonel modul, yoksa SmartAnswerShaper)."""
     try:
         from app.services.answer_shaper import shape_answer
         return shape_answer
@@ -33,11 +37,61 @@ def shaper():
         return SmartAnswerShaper().shape
 
 
-@pytest.fixture
-def post_processor():
-    """Full post processor fixture."""
-    from app.services.response_processor import full_post_process, get_preset_config
-    return full_post_process, get_preset_config
+@pytest.fixture(scope="session")
+def shaper():
+    """
+    Answer shaper fixture.
+
+    Shaper saf bir fonksiyon ve (result, mode, reason) tuple'i dondurur;
+    ayni (text, user_message, mode) girdisi session boyunca bir kez hesaplanir.
+    """
+    return lru_cache(maxsize=128)(_resolve_shaper())
+
+
+@pytest.fixture(scope="session")
+def professional_config():
+    """Professional preset config'i (bir kez hesaplanir, salt okunur)."""
+    return get_preset_config('professional')
+
+
+# =============================================================================
+# TEST VERILERI
+# =============================================================================
+
+_STEPS_SAMPLE = """Python kurulumu için şunları yapmalısınız. İlk olarak python.org sitesine gidin. İndirme sayfasından sisteminize uygun versiyonu seçin. İndirdiğiniz dosyayı çalıştırın."""
+
+_COMPARISON_SAMPLE = """React daha popüler ve topluluk desteği fazla. Vue öğrenmesi daha kolay. React performanslı ama Vue daha küçük bundle size'a sahip."""
+
+_CODE_SAMPLE = """İşte bir örnek:
+```python
+def hello():
+    print("Merhaba")
+```
+Bu kod ekrana Merhaba yazar."""
+
+_INCOMPLETE_CODE_SAMPLE = """Örnek:
+```python
+def test():
+    pass"""
+
+_TABLE_SAMPLE = """| Dil | Kullanım |
+|-----|----------|
+| Python | Backend |
+| JavaScript | Frontend |"""
+
+_JSON_SAMPLE = """Sonuç:
+```json
+{"name": "test", "value": 123}
+```"""
+
+_CASUAL_SAMPLE = "Merhaba! Bugün nasılsın? Umarım iyisindir."
+
+_FRIENDLY_SAMPLE = "Tabii ki yardımcı olabilirim! Bu konuda şunları söyleyebilirim..."
+
+_NUMBERED_LIST_SAMPLE = """Bu konuda dikkatli olunmalı:
+1. İlk madde
+2. İkinci madde
+3. Üçüncü madde"""
 
 
 # =============================================================================
@@ -49,10 +103,8 @@ class TestStepByStep:
     
     def test_technical_steps_are_numbered(self, shaper):
         """Teknik adımlar numaralandırılmalı."""
-        text = """Python kurulumu için şunları yapmalısınız. İlk olarak python.org sitesine gidin. İndirme sayfasından sisteminize uygun versiyonu seçin. İndirdiğiniz dosyayı çalıştırın."""
-        
         user_message = "Python nasıl kurulur?"
-        result, mode, reason = shaper(text, user_message, mode='auto')
+        result, mode, reason = shaper(_STEPS_SAMPLE, user_message, mode='auto')
         
         # Yapılandırılmış çıktı bekleniyor
         assert mode in ('list', 'steps', 'structured')
@@ -79,10 +131,8 @@ class TestComparison:
     
     def test_pros_cons_structure(self, shaper):
         """Artılar/Eksiler yapısı oluşturulmalı."""
-        text = """React daha popüler ve topluluk desteği fazla. Vue öğrenmesi daha kolay. React performanslı ama Vue daha küçük bundle size'a sahip."""
-        
         user_message = "React mı Vue mu kullanmalıyım?"
-        result, mode, reason = shaper(text, user_message, mode='auto')
+        result, mode, reason = shaper(_COMPARISON_SAMPLE, user_message, mode='auto')
         
         # Karşılaştırma yapısı bekleniyor
         has_structure = (
@@ -100,34 +150,20 @@ class TestComparison:
 class TestCodeExample:
     """Kod örneği formatı testleri."""
     
-    def test_code_block_preserved(self, post_processor):
+    def test_code_block_preserved(self, professional_config):
         """Kod blokları korunmalı."""
-        full_post_process, get_preset_config = post_processor
         
-        text = """İşte bir örnek:
-```python
-def hello():
-    print("Merhaba")
-```
-Bu kod ekrana Merhaba yazar."""
-        
-        result = full_post_process(text, get_preset_config('professional'))
+        result = full_post_process(_CODE_SAMPLE, professional_config)
         
         # Code block korunmalı
         assert '```python' in result
         assert 'def hello' in result
         assert '```' in result
     
-    def test_incomplete_code_block_closed(self, post_processor):
+    def test_incomplete_code_block_closed(self, professional_config):
         """Kapanmamış kod blokları kapatılmalı."""
-        full_post_process, get_preset_config = post_processor
-        
-        text = """Örnek:
-```python
-def test():
-    pass"""
         
-        result = full_post_process(text, get_preset_config('professional'))
+        result = full_post_process(_INCOMPLETE_CODE_SAMPLE, professional_config)
         
         # Kod bloğu kapatılmalı
         assert result.count('```') % 2 == 0
@@ -140,31 +176,19 @@ def test():
 class TestTableJson:
     """Tablo ve JSON formatı testleri."""
     
-    def test_table_preserved(self, post_processor):
+    def test_table_preserved(self, professional_config):
         """Markdown tabloları korunmalı."""
-        full_post_process, get_preset_config = post_processor
-        
-        text = """| Dil | Kullanım |
-|-----|----------|
-| Python | Backend |
-| JavaScript | Frontend |"""
         
-        result = full_post_process(text, get_preset_config('professional'))
+        result = full_post_process(_TABLE_SAMPLE, professional_config)
         
         # Tablo yapısı korunmalı
         assert '|' in result
         assert 'Python' in result
     
-    def test_json_in_code_block(self, post_processor):
+    def test_json_in_code_block(self, professional_config):
         """JSON kod bloğunda olmalı."""
-        full_post_process, get_preset_config = post_processor
         
-        text = """Sonuç:
-```json
-{"name": "test", "value": 123}
-```"""
-        
-        result = full_post_process(text, get_preset_config('professional'))
+        result = full_post_process(_JSON_SAMPLE, professional_config)
         
         assert '```json' in result or '```' in result
 
@@ -176,13 +200,10 @@ class TestTableJson:
 class TestCasualChat:
     """Düz sohbet testleri."""
     
-    def test_casual_response_not_over_formatted(self, post_processor):
+    def test_casual_response_not_over_formatted(self, professional_config):
         """Düz sohbet cevapları aşırı formatlanmamalı."""
-        full_post_process, get_preset_config = post_processor
         
-        text = "Merhaba! Bugün nasılsın? Umarım iyisindir."
-        
-        result = full_post_process(text, get_preset_config('professional'))
+        result = full_post_process(_CASUAL_SAMPLE, professional_config)
         
         # Emoji eklenmemeli (professional preset)
         assert '😀' not in result and '🙂' not in result
@@ -228,13 +249,10 @@ class TestWebToolOutput:
 class TestPersonaTone:
     """Persona tonu korunma testleri."""
     
-    def test_friendly_tone_preserved(self, post_processor):
+    def test_friendly_tone_preserved(self, professional_config):
         """Arkadaşça ton korunmalı."""
-        full_post_process, get_preset_config = post_processor
-        
-        text = "Tabii ki yardımcı olabilirim! Bu konuda şunları söyleyebilirim..."
         
-        result = full_post_process(text, get_preset_config('professional'))
+        result = full_post_process(_FRIENDLY_SAMPLE, professional_config)
         
         # Friendly ifadeler korunmalı
         assert 'yardımcı' in result.lower() or 'tabii' in result.lower()
@@ -247,16 +265,10 @@ class TestPersonaTone:
 class TestStrictCensorship:
     """Sıkı sansür formatı testleri."""
     
-    def test_format_not_broken_by_censorship(self, post_processor):
+    def test_format_not_broken_by_censorship(self, professional_config):
         """Sansür formatı bozmamalı."""
-        full_post_process, get_preset_config = post_processor
         
-        text = """Bu konuda dikkatli olunmalı:
-1. İlk madde
-2. İkinci madde
-3. Üçüncü madde"""
-        
-        result = full_post_process(text, get_preset_config('professional'))
+        result = full_post_process(_NUMBERED_LIST_SAMPLE, professional_config)
         
         # Liste yapısı korunmalı
         assert '1.' in result or '- ' in result
@@ -270,25 +282,17 @@ class TestStrictCensorship:
 class TestPresets:
     """Preset testleri."""
     
-    def test_professional_preset_exists(self, post_processor):
+    def test_professional_preset_exists(self, professional_config):
         """Professional preset mevcut olmalı."""
-        _, get_preset_config = post_processor
-        
-        config = get_preset_config('professional')
-        
-        assert config is not None
-        assert config.get('format_level') == 'professional'
+        assert professional_config is not None
+        assert professional_config.get('format_level') == 'professional'
     
     def test_professional_is_default(self):
         """Professional varsayılan preset olmalı."""
-        from app.plugins.response_enhancement.config import EnhancementConfig
-        
         assert EnhancementConfig.DEFAULT_PRESET == 'professional'
     
     def test_professional_no_emoji(self):
         """Professional preset'te emoji kapalı."""
-        from app.plugins.response_enhancement.config import EnhancementConfig
-        
         options = EnhancementConfig.get_options('professional')
         
         assert options.get('add_emojis') == False
@@ -1,18 +1,21 @@
 """
-Response Enhancement System - Test Script
+Response Enhancement System - Testler
 Tüm yeni formatlama özelliklerini test eder
 """
 
+import logging
+
+import pytest
+
 from app.services.response_processor import full_post_process, get_preset_config
 
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# GİRİŞ METİNLERİ
+# =============================================================================
 
-def test_basic_markdown():
-    """Temel Markdown formatlaması testi"""
-    print("=" * 60)
-    print("TEST 1: Temel Markdown Formatlaması")
-    print("=" * 60)
-    
-    input_text = """
+BASIC_MARKDOWN_IN = """
 KURULUM ADIMLARI
 
 Adım 1: Projeyi kur
@@ -21,22 +24,8 @@ Adım 1: Projeyi kur
 Adım 2: Bağımlılıkları yükle
 pip install komutu ile paketleri yükleyin.
     """
-    
-    result = full_post_process(input_text)
-    print("\n📥 GIRIŞ:")
-    print(input_text)
-    print("\n📤 ÇIKIŞ:")
-    print(result)
-    print("\n")
-
-
-def test_code_enhancement():
-    """Kod bloğu zenginleştirme testi"""
-    print("=" * 60)
-    print("TEST 2: Kod Bloğu Zenginleştirme")
-    print("=" * 60)
-    
-    input_text = """
+
+CODE_IN = """
 İşte bir örnek kod:
 
 ```
@@ -53,22 +42,8 @@ const greeting = () => {
 };
 ```
     """
-    
-    result = full_post_process(input_text)
-    print("\n📥 GIRIŞ:")
-    print(input_text)
-    print("\n📤 ÇIKIŞ:")
-    print(result)
-    print("\n")
-
-
-def test_emoji_callouts():
-    """Emoji ve callout kutusu testi"""
-    print("=" * 60)
-    print("TEST 3: Emoji ve Callout Kutuları")
-    print("=" * 60)
-    
-    input_text = """
+
+CALLOUTS_IN = """
 İpucu: Bu çok önemli bir bilgi
 
 Uyarı: Bu işlem geri alınamaz
@@ -79,22 +54,8 @@ KURULUM
 
 Bu adımları takip edin.
     """
-    
-    result = full_post_process(input_text)
-    print("\n📥 GIRIŞ:")
-    print(input_text)
-    print("\n📤 ÇIKIŞ:")
-    print(result)
-    print("\n")
-
-
-def test_list_formatting():
-    """Liste formatlaması testi"""
-    print("=" * 60)
-    print("TEST 4: Liste Formatlaması")
-    print("=" * 60)
-    
-    input_text = """
+
+LISTS_IN = """
 Yapılacaklar:
 
 -Proje planı hazırla
@@ -108,22 +69,8 @@ Numaralı liste:
 2.  İkinci adım
 3.Üçüncü adım
     """
-    
-    result = full_post_process(input_text)
-    print("\n📥 GIRIŞ:")
-    print(input_text)
-    print("\n📤 ÇIKIŞ:")
-    print(result)
-    print("\n")
-
-
-def test_turkish_rules():
-    """Türkçe yazım kuralları testi"""
-    print("=" * 60)
-    print("TEST 5: Türkçe Yazım Kuralları")
-    print("=" * 60)
-    
-    input_text = """
+
+TURKISH_IN = """
 bu bir cümle.sonra başka bir cümle gelir.
 
 değil mi ?
@@ -132,22 +79,8 @@ var mı ?
 
 için mi kullanıyoruz .
     """
-    
-    result = full_post_process(input_text)
-    print("\n📥 GIRIŞ:")
-    print(input_text)
-    print("\n📤 ÇIKIŞ:")
-    print(result)
-    print("\n")
-
-
-def test_format_levels():
-    """Format seviyeleri karşılaştırması"""
-    print("=" * 60)
-    print("TEST 6: Format Seviyeleri (Minimal vs Normal vs Rich)")
-    print("=" * 60)
-    
-    input_text = """
+
+FORMAT_LEVELS_IN = """
 KURULUM
 
 İpucu: Dikkatli okuyun
@@ -159,32 +92,8 @@ print("Hello")
 - Birinci madde
 - İkinci madde
     """
-    
-    print("\n📥 ORIJINAL METİN:")
-    print(input_text)
-    
-    print("\n--- MINIMAL FORMAT ---")
-    minimal = full_post_process(input_text, get_preset_config('minimal'))
-    print(minimal)
-    
-    print("\n--- NORMAL FORMAT ---")
-    normal = full_post_process(input_text, get_preset_config('normal'))
-    print(normal)
-    
-    print("\n--- RICH FORMAT ---")
-    rich = full_post_process(input_text, get_preset_config('rich'))
-    print(rich)
-    
-    print("\n")
-
-
-def test_comprehensive():
-    """Kapsamlı test - tüm özellikler birlikte"""
-    print("=" * 60)
-    print("TEST 7: Kapsamlı Test (Tüm Özellikler)")
-    print("=" * 60)
-    
-    input_text = """
+
+COMPREHENSIVE_IN = """
 PYTHON WEB UYGULAMASI NASIL YAPILIR
 
 KURULUM ADIMLARI
@@ -224,32 +133,50 @@ SONUÇ
 
 bu proje ile hızlı bir şekilde api geliştirebilirsiniz .değil mi ?
     """
-    
-    result = full_post_process(input_text)
-    print("\n📥 GIRIŞ:")
-    print(input_text)
-    print("\n📤 ÇIKIŞ (RICH FORMAT):")
-    print(result)
-    print("\n")
+
+
+# =============================================================================
+# TESTLER
+# =============================================================================
+
+# (preset, giris, ciktida bulunmasi gerekenler) - preset None = varsayilan
+PROCESS_CASES = [
+    pytest.param(None, BASIC_MARKDOWN_IN, ["## ", "Adım 1: Projeyi kur", "Adım 2"], id="basic_markdown"),
+    pytest.param(None, CODE_IN, ["```python", "```javascript", "hello_world"], id="code_enhancement"),
+    pytest.param(None, CALLOUTS_IN, ["İpucu:", "Uyarı:", "## Kurulum"], id="emoji_callouts"),
+    pytest.param(
+        None, LISTS_IN,
+        ["- Proje planı hazırla", "- Takım toplantısı yap", "1. İlk adım", "2. İkinci adım"],
+        id="list_formatting",
+    ),
+    pytest.param(
+        None, TURKISH_IN,
+        ["cümle. sonra", "değil mi?", "var mı?", "kullanıyoruz."],
+        id="turkish_rules",
+    ),
+    pytest.param("minimal", FORMAT_LEVELS_IN, ['print("Hello")', "- Birinci madde"], id="format_minimal"),
+    pytest.param("normal", FORMAT_LEVELS_IN, ['print("Hello")', "- Birinci madde"], id="format_normal"),
+    pytest.param("rich", FORMAT_LEVELS_IN, ['print("Hello")', "- Birinci madde"], id="format_rich"),
+    pytest.param(
+        None, COMPREHENSIVE_IN,
+        ["```python", "- API endpoints tasarla", "İpucu:", "değil mi?"],
+        id="comprehensive",
+    ),
+]
+
+
+@pytest.mark.parametrize("preset,input_text,must_contain", PROCESS_CASES)
+def test_process(preset, input_text, must_contain):
+    """Post-process çıktısı beklenen formatlama izlerini içermeli."""
+    options = get_preset_config(preset) if preset else None
+
+    result = full_post_process(input_text, options)
+    # Girdi/cikti dokumu: sadece --log-level=DEBUG ile gorunur (aksi halde formatlanmaz)
+    logger.debug("preset=%s\nGIRIS:%s\nCIKIS:\n%s", preset, input_text, result)
+
+    for expected in must_contain:
+        assert expected in result, f"'{expected}' çıktıda bulunamadı"
 
 
 if __name__ == "__main__":
-    print("\n🚀 RESPONSE ENHANCEMENT SYSTEM - TEST SÜİTİ\n")
-    
-    try:
-        test_basic_markdown()
-        test_code_enhancement()
-        test_emoji_callouts()
-        test_list_formatting()
-        test_turkish_rules()
-        test_format_levels()
-        test_comprehensive()
-        
-        print("=" * 60)
-        print("✅ TÜM TESTLER TAMAMLANDI!")
-        print("=" * 60)
-        
-    except Exception as e:
-        print(f"\n❌ HATA: {e}")
-        import traceback
-        traceback.print_exc()
+    pytest.main([__file__, "-v"])
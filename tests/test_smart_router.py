@@ -1,149 +1,62 @@
-﻿# -*- coding: utf-8 -*-
+# -*- coding: utf-8 -*-
 """
-Smart Router Test - Basit Test Scripti
-======================================
+Smart Router Testleri
+=====================
+
+Calistirma:
+    pytest tests/test_smart_router.py -v
 """
 
-import sys
-from pathlib import Path
+import pytest
+
+from app.chat.smart_router import RoutingTarget, SmartRouter
+
+# Kullanici sablonlari (ad -> MockUser alanlari); session basina bir kez olusturulur
+USER_TEMPLATES = {
+    "image": {"permissions": {"can_use_image": True}},
+    "internet": {"permissions": {"can_use_internet": True}},
+    "bela_unlocked": {"bela_unlocked": True},
+    "bela_locked": {"bela_unlocked": False},
+    "strict": {"permissions": {"can_use_image": True, "censorship_level": 2}},
+    "unrestricted": {"permissions": {"can_use_image": True, "censorship_level": 0}},
+    "local_normal": {"bela_unlocked": True, "permissions": {"censorship_level": 1}},
+}
+
+# (mesaj, kullanici sablonu, requested_model, beklenen target, beklenen blocked)
+# target None = sadece blocked kontrol edilir
+ROUTE_CASES = [
+    pytest.param("bana guzel bir resim ciz", "image", None, RoutingTarget.IMAGE, False, id="resim_ciz"),
+    pytest.param("hava bugun nasil olacak", "internet", None, RoutingTarget.INTERNET, False, id="hava_durumu"),
+    pytest.param("merhaba", "bela_unlocked", "bela", RoutingTarget.LOCAL, False, id="bela_unlocked"),
+    pytest.param("merhaba", "bela_locked", "bela", RoutingTarget.GROQ, False, id="bela_locked"),
+    pytest.param("nude kadin ciz", "strict", None, None, True, id="nsfw_blocked"),
+    pytest.param("nude kadin ciz", "unrestricted", None, RoutingTarget.IMAGE, False, id="nsfw_allowed"),
+    pytest.param("seninle roleplay yapmak istiyorum", "local_normal", None, RoutingTarget.LOCAL, False, id="roleplay_local"),
+    pytest.param("Python nedir aciklar misin", "local_normal", None, RoutingTarget.GROQ, False, id="normal_groq"),
+]
+
 
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+@pytest.fixture(scope="session")
+def router():
+    """SmartRouter (durumsuz, session boyunca bir kez olusturulur)."""
+    return SmartRouter()
 
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
 
+@pytest.fixture(scope="session")
+def users(make_user):
+    """USER_TEMPLATES'ten olusturulan paylasimli kullanicilar."""
+    return {name: make_user(**fields) for name, fields in USER_TEMPLATES.items()}
 
-@dataclass
-class MockUser:
-    """Test icin mock User sinifi."""
-    id: int = 1
-    username: str = "test_user"
-    bela_unlocked: bool = False
-    is_banned: bool = False
-    selected_model: Optional[str] = None
-    permissions: Optional[Dict[str, Any]] = None
-    
-    def __post_init__(self):
-        if self.permissions is None:
-            self.permissions = {}
 
+@pytest.mark.parametrize("message,user_key,requested_model,target,blocked", ROUTE_CASES)
+def test_route(router, users, message, user_key, requested_model, target, blocked):
+    """Mesaj + kullanici izinleri -> beklenen routing karari."""
+    d = router.route(message=message, user=users[user_key], requested_model=requested_model)
 
-def run_tests():
-    """Tum test senaryolarini calistirir."""
-    from app.chat.smart_router import RoutingTarget, SmartRouter, ToolIntent
-    
-    router = SmartRouter()
-    results = []
-    
-    print("=" * 60)
-    print("SMART ROUTER TEST SENARYOLARI")
-    print("=" * 60)
-    
-    # TEST 1: resim ciz -> IMAGE
-    print("\nTEST 1: 'resim ciz' -> IMAGE")
-    user = MockUser(permissions={"can_use_image": True})
-    d = router.route(message="bana guzel bir resim ciz", user=user)
-    passed = d.target == RoutingTarget.IMAGE
-    results.append(("resim_ciz", passed))
-    print(f"  Target: {d.target.value}")
-    print(f"  Reasons: {d.reason_codes}")
-    print(f"  Result: {'PASS' if passed else 'FAIL'}")
-    
-    # TEST 2: hava durumu -> INTERNET
-    print("\nTEST 2: 'hava durumu' -> INTERNET")
-    user = MockUser(permissions={"can_use_internet": True})
-    d = router.route(message="hava bugun nasil olacak", user=user)
-    passed = d.target == RoutingTarget.INTERNET
-    results.append(("hava_durumu", passed))
-    print(f"  Target: {d.target.value}")
-    print(f"  Reasons: {d.reason_codes}")
-    print(f"  Result: {'PASS' if passed else 'FAIL'}")
-    
-    # TEST 3: bela + unlocked -> LOCAL
-    print("\nTEST 3: requested_model=bela + bela_unlocked=True -> LOCAL")
-    user = MockUser(bela_unlocked=True)
-    d = router.route(message="merhaba", user=user, requested_model="bela")
-    passed = d.target == RoutingTarget.LOCAL
-    results.append(("bela_unlocked", passed))
-    print(f"  Target: {d.target.value}")
-    print(f"  Reasons: {d.reason_codes}")
-    print(f"  Result: {'PASS' if passed else 'FAIL'}")
-    
-    # TEST 4: bela + locked -> GROQ
-    print("\nTEST 4: requested_model=bela + bela_unlocked=False -> GROQ")
-    user = MockUser(bela_unlocked=False)
-    d = router.route(message="merhaba", user=user, requested_model="bela")
-    passed = d.target == RoutingTarget.GROQ
-    results.append(("bela_locked", passed))
-    print(f"  Target: {d.target.value}")
-    print(f"  Reasons: {d.reason_codes}")
-    print(f"  Result: {'PASS' if passed else 'FAIL'}")
-    
-    # TEST 5: strict + nsfw image -> BLOCKED
-    print("\nTEST 5: censorship_level=2 + nsfw image -> BLOCKED")
-    user = MockUser(permissions={"can_use_image": True, "censorship_level": 2})
-    d = router.route(message="nude kadin ciz", user=user)
-    passed = d.blocked == True
-    results.append(("nsfw_blocked", passed))
-    print(f"  Target: {d.target.value}")
-    print(f"  Blocked: {d.blocked}")
-    print(f"  Reasons: {d.reason_codes}")
-    print(f"  Result: {'PASS' if passed else 'FAIL'}")
-    
-    # TEST 6: unrestricted + nsfw image -> IMAGE
-    print("\nTEST 6: censorship_level=0 + nsfw image -> IMAGE (allowed)")
-    user = MockUser(permissions={"can_use_image": True, "censorship_level": 0})
-    d = router.route(message="nude kadin ciz", user=user)
-    passed = d.target == RoutingTarget.IMAGE and not d.blocked
-    results.append(("nsfw_allowed", passed))
-    print(f"  Target: {d.target.value}")
-    print(f"  Blocked: {d.blocked}")
-    print(f"  Reasons: {d.reason_codes}")
-    print(f"  Result: {'PASS' if passed else 'FAIL'}")
-    
-    # TEST 7: roleplay -> LOCAL
-    print("\nTEST 7: roleplay icerik -> LOCAL")
-    user = MockUser(bela_unlocked=True, permissions={"censorship_level": 1})
-    d = router.route(message="seninle roleplay yapmak istiyorum", user=user)
-    passed = d.target == RoutingTarget.LOCAL
-    results.append(("roleplay_local", passed))
-    print(f"  Target: {d.target.value}")
-    print(f"  Tool Intent: {d.tool_intent.value}")
-    print(f"  Reasons: {d.reason_codes}")
-    print(f"  Result: {'PASS' if passed else 'FAIL'}")
-    
-    # TEST 8: normal sohbet -> GROQ
-    print("\nTEST 8: normal sohbet -> GROQ")
-    user = MockUser(bela_unlocked=True, permissions={"censorship_level": 1})
-    d = router.route(message="Python nedir aciklar misin", user=user)
-    passed = d.target == RoutingTarget.GROQ
-    results.append(("normal_groq", passed))
-    print(f"  Target: {d.target.value}")
-    print(f"  Reasons: {d.reason_codes}")
-    print(f"  Result: {'PASS' if passed else 'FAIL'}")
-    
-    # OZET
-    print("\n" + "=" * 60)
-    print("TEST SONUCLARI")
-    print("=" * 60)
-    
-    total = len(results)
-    passed_count = sum(1 for _, p in results if p)
-    
-    for name, p in results:
-        status = "PASS" if p else "FAIL"
-        print(f"  [{status}] {name}")
-    
-    print(f"\nToplam: {total}, Gecen: {passed_count}, Kalan: {total - passed_count}")
-    
-    if passed_count == total:
-        print("\nTUM TESTLER BASARILI!")
-        return 0
-    else:
-        print("\nBAZI TESTLER BASARISIZ!")
-        return 1
+    assert d.blocked is blocked
+    if target is not None:
+        assert d.target == target
 
 
 if __name__ == "__main__":
-    sys.exit(run_tests())
+    pytest.main([__file__, "-v"])
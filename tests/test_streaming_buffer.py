@@ -6,68 +6,97 @@ Bu test dosyası streaming buffer'ın memory leak'i önlediğini doğrular.
 """
 
 import asyncio
+import tracemalloc
 
 import pytest
 
 from app.chat.streaming_buffer import StreamingBuffer
 
 
+# Buyuk payload'lar modul yuklenirken bir kez olusturulur (str immutable, paylasilabilir)
+_100_CHUNK = "x" * 100
+_10K_CHUNK = "x" * 10000
+_MB_CHUNK = "x" * (1024 * 1024)
+
+# Numarali chunk'lar ve concurrent stream tablolari da bir kez formatlanir
+_CHUNKS = tuple(f"chunk{i}" for i in range(100))
+_STREAM_CHUNKS = {
+    buffer_id: tuple(f"buffer{buffer_id}_chunk{i}" for i in range(100))
+    for buffer_id in (1, 2, 3)
+}
+
+# Ortak buffer boyutlari (yasam dongusu testleri her boyutta kosar)
+BUFFER_SIZES = [5, 10, 100]
+
+
+@pytest.fixture(params=BUFFER_SIZES, ids=lambda n: f"max{n}")
+def buffer(request):
+    """Parametrize edilmis bos StreamingBuffer."""
+    return StreamingBuffer(max_chunks=request.param)
+
+
 class TestStreamingBuffer:
     """StreamingBuffer unit testleri"""
     
-    def test_buffer_initialization(self):
+    def test_buffer_initialization(self, buffer):
         """Buffer doğru initialize ediliyor mu?"""
-        buffer = StreamingBuffer(max_chunks=100)
-        
-        assert buffer.max_chunks == 100
+        assert buffer.max_chunks in BUFFER_SIZES
         assert len(buffer) == 0
-        assert buffer._finalized is None
+        assert buffer.get_stats()["finalized"] is False
     
-    def test_append_chunks(self):
-        """Chunk'lar doğru ekleniyor mu?"""
-        buffer = StreamingBuffer(max_chunks=10)
-        
+    def test_append_finalize_clear(self, buffer):
+        """Append -> finalize -> clear yaşam döngüsü doğru çalışıyor mu?"""
         buffer.append("Hello")
         buffer.append(" ")
         buffer.append("World")
         
         assert len(buffer) == 3
-        assert buffer._total_chunks_received == 3
+        assert buffer.get_stats()["total_received"] == 3
+        
+        result = buffer.finalize()
+        
+        assert result == "Hello World"
+        assert buffer.get_stats()["finalized"] is True
+        assert len(buffer.chunks) == 0  # Buffer cleared
+        
+        buffer.clear()
+        stats = buffer.get_stats()
+        
+        assert len(buffer) == 0
+        assert stats["finalized"] is False
+        assert stats["total_received"] == 0
     
     def test_circular_buffer_overflow(self):
         """Buffer dolunca en eski chunk siliniyor mu?"""
         buffer = StreamingBuffer(max_chunks=5)
         
         # 10 chunk ekle (max 5)
-        for i in range(10):
-            buffer.append(f"chunk{i}")
+        for chunk in _CHUNKS[:10]:
+            buffer.append(chunk)
         
         # Sadece son 5 chunk kalmalı
         assert len(buffer) == 5
-        assert buffer._chunks_dropped == 5
+        assert buffer.get_stats()["dropped"] == 5
         
         # Son 5 chunk kontrol et
         chunks = list(buffer.chunks)
         assert chunks == ["chunk5", "chunk6", "chunk7", "chunk8", "chunk9"]
     
-    def test_finalize(self):
-        """Finalize doğru çalışıyor mu?"""
-        buffer = StreamingBuffer(max_chunks=100)
-        
-        buffer.append("Hello")
-        buffer.append(" ")
-        buffer.append("World")
+    def test_ring_wraparound_order(self):
+        """Ring ortadan sarınca chunk sırası (FIFO) korunuyor mu?"""
+        buffer = StreamingBuffer(max_chunks=5)
         
-        result = buffer.finalize()
+        for i in range(7):
+            buffer.append(f"c{i}")
         
-        assert result == "Hello World"
-        assert buffer._finalized == "Hello World"
-        assert len(buffer.chunks) == 0  # Buffer cleared
+        assert list(buffer.chunks) == ["c2", "c3", "c4", "c5", "c6"]
+        assert buffer.chunks[0] == "c2"
+        assert buffer.chunks[-1] == "c6"
+        assert buffer.finalize() == "c2c3c4c5c6"
+        assert all(slot is None for slot in buffer._ring)  # Referanslar bırakıldı
     
-    def test_finalize_multiple_calls(self):
+    def test_finalize_multiple_calls(self, buffer):
         """Finalize birden fazla çağrılabilir mi?"""
-        buffer = StreamingBuffer(max_chunks=100)
-        
         buffer.append("Test")
         
         result1 = buffer.finalize()
@@ -75,35 +104,62 @@ class TestStreamingBuffer:
         
         assert result1 == result2 == "Test"
     
-    def test_clear(self):
-        """Clear tüm data'yı temizliyor mu?"""
-        buffer = StreamingBuffer(max_chunks=100)
+    def test_append_after_finalize_invalidates_cache(self, buffer):
+        """Finalize sonrası append cache'i geçersiz kılıyor mu?"""
+        buffer.append("Hello")
+        assert buffer.finalize() == "Hello"
         
-        buffer.append("Test")
+        buffer.append(" World")
+        assert buffer.get_stats()["finalized"] is False
+        assert buffer.finalize() == "Hello World"
+    
+    def test_dropped_count_across_finalize(self):
+        """Finalize ve sonraki append'lerde dropped sayısı doğru kalıyor mu?"""
+        buffer = StreamingBuffer(max_chunks=3)
+        
+        for i in range(5):
+            buffer.append(f"c{i}")
+        assert buffer.finalize() == "c2c3c4"
+        assert buffer.get_stats()["dropped"] == 2
+        
+        # Finalize metni seed chunk olur: [seed, a, b] dolu, c ile seed düşer
+        for chunk in ("a", "b", "c"):
+            buffer.append(chunk)
+        assert buffer.get_stats()["dropped"] == 3
+        assert buffer.finalize() == "abc"
+    
+    @pytest.mark.parametrize("batch", [["a", "", "b"], [f"c{i}" for i in range(12)]], ids=["fits", "overflow"])
+    def test_extend_matches_append(self, buffer, batch):
+        """extend() tek tek append() ile aynı sonucu veriyor mu?"""
+        expected = StreamingBuffer(max_chunks=buffer.max_chunks)
+        for chunk in ["x", "y", "z"]:
+            expected.append(chunk)
+            buffer.append(chunk)
+        expected.finalize()
         buffer.finalize()
         
-        buffer.clear()
+        for chunk in batch:
+            expected.append(chunk)
+        buffer.extend(batch)
         
-        assert len(buffer) == 0
-        assert buffer._finalized is None
-        assert buffer._total_chunks_received == 0
+        assert list(buffer.chunks) == list(expected.chunks)
+        assert buffer.get_stats() == expected.get_stats()
+        assert buffer.finalize() == expected.finalize()
     
-    def test_empty_chunks_ignored(self):
+    def test_empty_chunks_ignored(self, buffer):
         """Boş chunk'lar ignore ediliyor mu?"""
-        buffer = StreamingBuffer(max_chunks=100)
-        
         buffer.append("")
         buffer.append("Valid")
         
         assert len(buffer) == 1
-        assert buffer._total_chunks_received == 1
+        assert buffer.get_stats()["total_received"] == 1
     
     def test_stats(self):
         """Stats doğru döndürülüyor mu?"""
         buffer = StreamingBuffer(max_chunks=5)
         
-        for i in range(7):
-            buffer.append(f"chunk{i}")
+        for chunk in _CHUNKS[:7]:
+            buffer.append(chunk)
         
         stats = buffer.get_stats()
         
@@ -111,15 +167,15 @@ class TestStreamingBuffer:
         assert stats["current_chunks"] == 5
         assert stats["total_received"] == 7
         assert stats["dropped"] == 2
+        assert stats["total_chars"] == sum(len(c) for c in buffer.chunks)
         assert stats["finalized"] is False
         
         buffer.finalize()
         stats = buffer.get_stats()
         assert stats["finalized"] is True
-
-
-class TestStreamingBufferMemoryManagement:
-    """Memory management testleri"""
+        assert stats["total_chars"] == 0
+    
+    # Memory management
     
     def test_memory_usage_stays_bounded(self):
         """Memory kullanımı sınırlı kalıyor mu?"""
@@ -127,44 +183,61 @@ class TestStreamingBufferMemoryManagement:
         
         # 1000 chunk ekle (max 100)
         for i in range(1000):
-            buffer.append("x" * 100)  # 100 char chunks
+            buffer.append(_100_CHUNK)
         
         # Buffer max 100 chunk tutuyor
         assert len(buffer) == 100
-        assert buffer._chunks_dropped == 900
+        assert buffer.get_stats()["dropped"] == 900
         
         # Finalize sonrası buffer temiz
         result = buffer.finalize()
         assert len(buffer.chunks) == 0
     
-    def test_large_chunks_handled(self):
+    def test_memory_large_chunks_handled(self):
         """Büyük chunk'lar handle ediliyor mu?"""
         buffer = StreamingBuffer(max_chunks=10)
         
         # 10KB chunk'lar ekle
         for i in range(20):
-            buffer.append("x" * 10000)
+            buffer.append(_10K_CHUNK)
         
         result = buffer.finalize()
         
         # Son 10 chunk var (10 * 10KB = 100KB)
         assert len(result) == 10 * 10000
         assert len(buffer.chunks) == 0  # Cleared after finalize
-
-
-@pytest.mark.asyncio
-class TestStreamingBufferAsyncUsage:
-    """Async kullanım testleri"""
     
+    def test_memory_finalize_peak_single_copy(self):
+        """Finalize (wrap olmuş ring) çıktıyı tek kopyada mı üretiyor?"""
+        buffer = StreamingBuffer(max_chunks=20)
+        chunk = "x" * 65536
+        
+        for i in range(25):
+            buffer.append(chunk)
+        
+        tracemalloc.start()
+        try:
+            result = buffer.finalize()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        # str.join çıktıyı bir kez ayırır; ara kopya (bytes/bytearray) yok
+        assert len(result) == 20 * 65536
+        assert peak < 1.1 * len(result)
+    
+    # Async kullanım
+    
+    @pytest.mark.asyncio
     async def test_async_streaming_simulation(self):
         """Async streaming simülasyonu"""
         buffer = StreamingBuffer(max_chunks=100)
         
         async def mock_stream():
             """Mock streaming source"""
-            for i in range(50):
-                await asyncio.sleep(0.001)  # Simulate async delay
-                yield f"chunk{i} "
+            for chunk in _CHUNKS[:50]:
+                await asyncio.sleep(0)  # Event loop'a yield (timer yok)
+                yield chunk
         
         # Stream chunks to buffer
         async for chunk in mock_stream():
@@ -176,14 +249,15 @@ class TestStreamingBufferAsyncUsage:
         assert "chunk49" in result
         assert len(buffer.chunks) == 0
     
-    async def test_concurrent_buffers(self):
+    @pytest.mark.asyncio
+    async def test_async_concurrent_buffers(self):
         """Concurrent buffer'lar interference yapmıyor mu?"""
         async def process_stream(buffer_id: int):
             buffer = StreamingBuffer(max_chunks=50)
             
-            for i in range(100):
-                buffer.append(f"buffer{buffer_id}_chunk{i}")
-                await asyncio.sleep(0.001)
+            for chunk in _STREAM_CHUNKS[buffer_id]:
+                buffer.append(chunk)
+                await asyncio.sleep(0)
             
             return buffer.finalize()
         
@@ -202,22 +276,20 @@ class TestStreamingBufferAsyncUsage:
         # Interference yok
         assert "buffer2_" not in results[0]
         assert "buffer1_" not in results[1]
-
-
-class TestStreamingBufferEdgeCases:
-    """Edge case testleri"""
     
-    def test_max_chunks_zero(self):
+    # Edge case'ler
+    
+    def test_edge_max_chunks_zero(self):
         """max_chunks=0 durumu"""
         buffer = StreamingBuffer(max_chunks=0)
         
         buffer.append("Test")
         
-        # Deque maxlen=0 hiçbir şey tutmaz
+        # max_chunks=0 hiçbir şey tutmaz
         assert len(buffer) == 0
         assert buffer.finalize() == ""
     
-    def test_max_chunks_one(self):
+    def test_edge_max_chunks_one(self):
         """max_chunks=1 durumu"""
         buffer = StreamingBuffer(max_chunks=1)
         
@@ -229,7 +301,7 @@ class TestStreamingBufferEdgeCases:
         assert len(buffer) == 1
         assert list(buffer.chunks) == ["Third"]
     
-    def test_unicode_chunks(self):
+    def test_edge_unicode_chunks(self):
         """Unicode karakterler handle ediliyor mu?"""
         buffer = StreamingBuffer(max_chunks=100)
         
@@ -240,16 +312,83 @@ class TestStreamingBufferEdgeCases:
         result = buffer.finalize()
         assert result == "Merhaba 🌍 Dünya!"
     
-    def test_very_long_single_chunk(self):
+    def test_edge_binary_unicode_chunks(self):
+        """Binary modda UTF-8 chunk'lar (karakter ortasından bölünmüş) tek seferde decode ediliyor mu?"""
+        buffer = StreamingBuffer(max_chunks=100, binary=True)
+        data = "Merhaba 🌍 Dünya!".encode("utf-8")
+        
+        # Emoji'nin 4 byte'ı iki chunk'a bölünür
+        split = data.index("🌍".encode("utf-8")) + 2
+        buffer.append(data[:split])
+        buffer.append(data[split:])
+        
+        assert buffer.get_stats()["total_chars"] == len(data)
+        assert buffer.finalize() == "Merhaba 🌍 Dünya!"
+    
+    def test_edge_binary_rejects_str(self):
+        """Binary buffer str chunk'ı append/extend'te reddediyor mu?"""
+        buffer = StreamingBuffer(max_chunks=10, binary=True)
+        
+        with pytest.raises(TypeError):
+            buffer.append("metin")
+        with pytest.raises(TypeError):
+            buffer.extend([b"ok", "metin"])
+        with pytest.raises(TypeError):
+            buffer.extend([""])  # append("") ile ayni: bos str de reddedilir
+        assert len(buffer) == 0
+    
+    def test_edge_binary_invalid_utf8_strict(self):
+        """Geçersiz UTF-8 gizlenmemeli; overflow'da sadece baştaki kesik karakter atlanmalı."""
+        buffer = StreamingBuffer(max_chunks=10, binary=True)
+        buffer.append(b"abc\xff")
+        with pytest.raises(UnicodeDecodeError):
+            buffer.finalize()
+        
+        # "ğ" (2 byte) chunk sınırında bölünür, ilk yarısı overflow ile düşer
+        buffer = StreamingBuffer(max_chunks=2, binary=True)
+        data = "ağb".encode("utf-8")
+        buffer.extend([data[:2], data[2:], b"c"])
+        assert buffer.finalize() == "bc"
+        
+        # Overflow sonrası ortadaki geçersiz byte yine hata verir
+        buffer = StreamingBuffer(max_chunks=2, binary=True)
+        buffer.extend([b"a", data[2:], b"c\xff"])
+        with pytest.raises(UnicodeDecodeError):
+            buffer.finalize()
+        
+        # Önceki overflow sonraki finalize'ları gevşetmez
+        buffer = StreamingBuffer(max_chunks=2, binary=True)
+        buffer.extend([b"a", b"b", b"c"])
+        assert buffer.finalize() == "bc"
+        buffer.append(b"\xffx")
+        with pytest.raises(UnicodeDecodeError):
+            buffer.finalize()
+    
+    def test_edge_binary_finalize_reuses_pool(self, monkeypatch):
+        """Binary finalize havuzdaki bytearray'i tekrar kullanıyor mu?"""
+        # Global havuz yerine teste özel boş havuz (test sonunda geri alınır)
+        monkeypatch.setattr(StreamingBuffer, "_POOL", [])
+        
+        first = StreamingBuffer(max_chunks=10, binary=True)
+        first.extend([b"abc", b"def"])
+        assert first.finalize() == "abcdef"
+        assert len(StreamingBuffer._POOL) == 1
+        pooled = StreamingBuffer._POOL[0]
+        
+        second = StreamingBuffer(max_chunks=10, binary=True)
+        second.append(b"xyz")
+        assert second.finalize() == "xyz"
+        assert len(StreamingBuffer._POOL) == 1
+        assert StreamingBuffer._POOL[0] is pooled  # Yeni buffer ayrılmadı
+    
+    def test_edge_very_long_single_chunk(self):
         """Çok uzun tek chunk"""
         buffer = StreamingBuffer(max_chunks=10)
         
-        # 1MB chunk
-        long_chunk = "x" * (1024 * 1024)
-        buffer.append(long_chunk)
+        buffer.append(_MB_CHUNK)  # 1MB chunk
         
         result = buffer.finalize()
-        assert len(result) == 1024 * 1024
+        assert len(result) == len(_MB_CHUNK)
         assert len(buffer.chunks) == 0
 
 